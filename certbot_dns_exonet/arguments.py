@@ -0,0 +1,30 @@
+"""Argument types shared by the certbot plugin and the stand-alone hook."""
+
+from __future__ import annotations
+
+from argparse import ArgumentTypeError
+
+
+def positive_int(value: str) -> int:
+    """Parse a positive integer argument.
+
+    Args:
+        value: The argument value.
+
+    Raises:
+        ArgumentTypeError: If the value is not a positive integer.
+
+    Returns:
+        The parsed integer.
+
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number < 1:
+        msg = f"must be a positive integer, not {value!r}"
+        raise ArgumentTypeError(msg)
+
+    return number
@@ -1,12 +1,37 @@
 """DNS Authenticator for the Exonet API."""
 
-from collections.abc import Callable
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
 from logging import getLogger
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING
 
-from certbot.configuration import NamespaceConfig
+from certbot.display import util as display_util
+from certbot.errors import PluginError
 from certbot.plugins.dns_common import CredentialsConfiguration, DNSAuthenticator
 
+from certbot_dns_exonet.arguments import positive_int
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.diagnostics.profiler import Profiler
+from certbot_dns_exonet.diagnostics.tracer import ChallengeTracer
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
 from certbot_dns_exonet.services.dns_service import DnsService
+from certbot_dns_exonet.services.zone_coordinator import ZoneCoordinator
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from acme.challenges import ChallengeResponse
+    from certbot.achallenges import AnnotatedChallenge
+    from certbot.configuration import NamespaceConfig
+
+    from certbot_dns_exonet.services.challenge_plan import Challenge
 
 LOGGER = getLogger(__name__)
 
@@ -20,6 +45,9 @@ class ExonetAuthenticator(DNSAuthenticator):
     description = "Obtain certificates using a DNS TXT record with the Exonet DNS."
 
     credentials: CredentialsConfiguration
+    plan: ChallengePlan
+    profiler: Profiler | None
+    tracer: ChallengeTracer | None
 
     def __init__(self, config: NamespaceConfig, name: str) -> None:
         """Construct the Authenticator class.
@@ -32,7 +60,31 @@ class ExonetAuthenticator(DNSAuthenticator):
         super().__init__(config, name)
         self._setup_credentials()
 
-        self.dns_service = DnsService(str(self.credentials.conf("token")))
+        circuit_breaker_state = self.conf("circuit-breaker-state")
+        coordination_dir = self.conf("coordination-dir")
+        trace = self.conf("trace")
+        memory_ceiling = self.conf("memory-ceiling")
+        self.tracer = ChallengeTracer(Path(trace)) if trace else None
+        self.dns_service = DnsService(
+            str(self.credentials.conf("token")),
+            CircuitBreaker.shared(
+                Path(circuit_breaker_state) if circuit_breaker_state else None
+            ),
+            ZoneCoordinator(Path(coordination_dir)) if coordination_dir else None,
+            self.tracer,
+            memory_ceiling * 1024 * 1024 if memory_ceiling else None,
+        )
+        self.plan = ChallengePlan()
+
+        profile = self.conf("profile")
+        self.profiler = Profiler(Path(profile)) if profile else None
+        if self.profiler:
+            self.dns_service.client.listeners.append(self.profiler.record)
+            self.dns_service.profiler = self.profiler
+
+        # Overlap the zone lookups with the ACME order setup.
+        if self.conf("prefetch") and config.domains:
+            self.dns_service.prefetch_zones(config.domains)
 
     @classmethod
     def add_parser_arguments(
@@ -47,6 +99,57 @@ class ExonetAuthenticator(DNSAuthenticator):
         """
         super().add_parser_arguments(add, default_propagation_seconds)
         add("credentials", help="Exonet credentials INI file.")
+        add(
+            "circuit-breaker-state",
+            default=None,
+            help="File to keep the Exonet API circuit breaker state in, so "
+            "consecutive certbot runs fail fast while the API is unavailable.",
+        )
+        add(
+            "profile",
+            default=None,
+            help="Directory to write a CPU (cProfile) and memory (tracemalloc) "
+            "profile of the plugin run to.",
+        )
+        add(
+            "coordination-dir",
+            default=None,
+            help="Directory shared by concurrent certbot processes to lock DNS "
+            "zones and share their DNS record listings.",
+        )
+        add(
+            "prefetch",
+            action="store_true",
+            help="Look up the DNS zones of the requested domains in the background "
+            "while certbot sets up the ACME order.",
+        )
+        add(
+            "trace",
+            default=None,
+            help="File to append a JSON line per challenge to, with the duration "
+            "of each phase and the number of Exonet API calls.",
+        )
+        add(
+            "dry-run",
+            action="store_true",
+            help="Only look up the DNS zones and report the predicted number of "
+            "Exonet API calls and bytes, without creating any DNS records. The "
+            "challenges fail, so no certificate is obtained.",
+        )
+        add(
+            "chunk-size",
+            type=positive_int,
+            default=DnsService.chunk_size,
+            help="The number of challenges created and deleted at once, bounding "
+            "the memory used for very large batches.",
+        )
+        add(
+            "memory-ceiling",
+            type=positive_int,
+            default=None,
+            help="The approximate memory in MiB the cached DNS record listings and "
+            "Exonet API responses may use, evicting the least recently used.",
+        )
 
     def more_info(self) -> str:
         """Get more info about the plugin.
@@ -60,6 +163,110 @@ class ExonetAuthenticator(DNSAuthenticator):
             "challenge using the Exonet API."
         )
 
+    def perform(self, achalls: list[AnnotatedChallenge]) -> list[ChallengeResponse]:
+        """Add TXT DNS records for all challenges using the Exonet API.
+
+        The plan is computed for all challenges at once and kept, so the cleanup
+        can reuse it without looking up the DNS zones and records again. The
+        registered domains are performed concurrently, in chunks of challenges.
+
+        Args:
+            achalls: The annotated challenges to perform.
+
+        Raises:
+            PluginError: When running dry, after reporting the estimate.
+
+        Returns:
+            The challenge responses.
+
+        """
+        self._setup_credentials()
+
+        if self.conf("dry-run"):
+            estimate = self.dns_service.estimate_txt_records(
+                [self._challenge(achall) for achall in achalls]
+            )
+            display_util.notify(estimate.report())
+            self.dns_service.close()
+
+            msg = "Dry run, no DNS records were created."
+            raise PluginError(msg)
+
+        self._attempt_cleanup = True
+
+        records: list[PlannedRecord] = []
+
+        with self._profile("perform"):
+            try:
+                for plan in self.dns_service.perform_txt_records_chunked(
+                    (self._challenge(achall) for achall in achalls),
+                    self.conf("chunk-size"),
+                ):
+                    records.extend(plan)
+            except IncompletePlanError as error:
+                records.extend(error.plan)
+                raise
+            finally:
+                # Keep the partially performed plan, so it can still be cleaned up.
+                self.plan = ChallengePlan(tuple(records))
+
+        responses = [achall.response(achall.account_key) for achall in achalls]
+
+        # DNS updates take time to propagate, see DNSAuthenticator.perform.
+        display_util.notify(
+            f"Waiting {self.conf('propagation-seconds')} seconds for DNS changes "
+            "to propagate"
+        )
+        start = perf_counter()
+        sleep(self.conf("propagation-seconds"))
+        if self.tracer:
+            self.tracer.add(
+                [record.challenge for record in self.plan],
+                "propagation",
+                perf_counter() - start,
+            )
+
+        return responses
+
+    def cleanup(self, achalls: list[AnnotatedChallenge]) -> None:
+        """Delete TXT DNS records for all challenges using the Exonet API.
+
+        Args:
+            achalls: The annotated challenges to clean up.
+
+        """
+        if not self._attempt_cleanup:
+            return
+
+        # Challenges that are not part of the plan were never performed.
+        plan = self.plan.select([self._challenge(achall) for achall in achalls])
+
+        try:
+            with self._profile("cleanup"):
+                self.dns_service.del_txt_records_chunked(plan, self.conf("chunk-size"))
+        finally:
+            self.dns_service.close()
+            if self.profiler:
+                self.profiler.write_report()
+            if self.tracer:
+                self.tracer.write(plan)
+
+    def _profile(self, section: str) -> AbstractContextManager[None]:
+        if not self.profiler:
+            return nullcontext()
+
+        return self.profiler.profile(section)
+
+    @staticmethod
+    def _challenge(achall: AnnotatedChallenge) -> Challenge:
+        domain = achall.identifier.value
+
+        return (
+            domain,
+            achall.validation_domain_name(domain),
+            achall.validation(achall.account_key),
+        )
+
     def _setup_credentials(self) -> None:
         self.credentials = self._configure_credentials(
             "credentials",
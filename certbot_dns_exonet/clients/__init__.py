@@ -1,7 +1,13 @@
 """Certbot DNS Exonet clients."""
 
+from .circuit_breaker import CircuitBreaker
+from .dns_record import DnsRecord
 from .exonet_client import ExonetClient
+from .response_cache import ResponseCache
 
 __all__ = [
+    "CircuitBreaker",
+    "DnsRecord",
     "ExonetClient",
+    "ResponseCache",
 ]
@@ -0,0 +1,197 @@
+"""Circuit breaker that stops calling the Exonet API while it keeps failing."""
+
+from __future__ import annotations
+
+import json
+from logging import getLogger
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, ClassVar
+
+from certbot.errors import PluginError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError, Timeout
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+
+LOGGER = getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling the Exonet API while it keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and every
+    call fails fast with a PluginError, until `reset_timeout` seconds have passed.
+    Then a single trial call is let through: when the API answers (also with a
+    client error) the breaker closes again, on failure it stays open for another
+    `reset_timeout` seconds.
+
+    Only failures caused by the API being unavailable count: connection errors,
+    timeouts, rate limiting and server errors. Client errors (e.g. an invalid
+    token or a validation error) do not open the breaker.
+
+    The state is kept in memory, so it is shared by all clients in a process that
+    use the same breaker. When a state file is given, the state is also persisted
+    there so it is shared between processes (e.g. consecutive certbot runs).
+    """
+
+    _shared: ClassVar[dict[Path | None, CircuitBreaker]] = {}
+    _shared_lock: ClassVar[Lock] = Lock()
+
+    failure_threshold: int
+    reset_timeout: float
+    state_file: Path | None
+    failures: int
+    opened_at: float | None
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 300,
+        state_file: Path | None = None,
+    ) -> None:
+        """Circuit breaker constructor.
+
+        Args:
+            failure_threshold: Number of consecutive failures that opens the breaker.
+            reset_timeout: Number of seconds the breaker stays open.
+            state_file: Optional file to persist the breaker state in.
+
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_file = state_file
+        self.failures = 0
+        self.opened_at = None
+        self._lock = Lock()
+
+    @classmethod
+    def shared(cls, state_file: Path | None = None) -> CircuitBreaker:
+        """Get the breaker shared by all clients in this process.
+
+        Args:
+            state_file: Optional file to persist the breaker state in.
+
+        Returns:
+            The shared breaker for the given state file.
+
+        """
+        with cls._shared_lock:
+            if state_file not in cls._shared:
+                cls._shared[state_file] = cls(state_file=state_file)
+
+            return cls._shared[state_file]
+
+    def __enter__(self) -> None:
+        """Check the breaker before calling the Exonet API.
+
+        Raises:
+            PluginError: If the breaker is open.
+
+        """
+        with self._lock:
+            self._load()
+
+            if self.opened_at is None:
+                return
+
+            remaining = self.opened_at + self.reset_timeout - time()
+            if remaining > 0:
+                msg = (
+                    "The Exonet API is unavailable after "
+                    f"{self.failures} consecutive failures, not trying again "
+                    f"for {int(remaining) + 1} seconds."
+                )
+                raise PluginError(msg)
+
+            # Let a single trial call through, other calls keep failing fast.
+            LOGGER.debug("Trying the Exonet API again after it was unavailable.")
+            self.opened_at = time()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Record the outcome of the call to the Exonet API.
+
+        Args:
+            exc_type: The type of the raised exception, if any.
+            exc_value: The raised exception, if any.
+            traceback: The traceback of the raised exception, if any.
+
+        """
+        # The API answered, e.g. with a client error, so it is available.
+        answered = exc_value is None or (
+            isinstance(exc_value, HTTPError) and not self.is_failure(exc_value)
+        )
+        if exc_value is not None and not answered and not self.is_failure(exc_value):
+            return
+
+        with self._lock:
+            if answered:
+                if self.failures or self.opened_at is not None:
+                    self.failures = 0
+                    self.opened_at = None
+                    self._save()
+                return
+
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    LOGGER.warning(
+                        "The Exonet API failed %d consecutive times, failing fast "
+                        "for %d seconds.",
+                        self.failures,
+                        self.reset_timeout,
+                    )
+                self.opened_at = time()
+            self._save()
+
+    @staticmethod
+    def is_failure(exception: BaseException) -> bool:
+        """Check if an exception means the Exonet API is unavailable.
+
+        Args:
+            exception: The exception raised when calling the Exonet API.
+
+        Returns:
+            True if the exception counts as a failure.
+
+        """
+        if isinstance(exception, HTTPError):
+            status_code = getattr(exception.response, "status_code", None)
+            return isinstance(status_code, int) and (
+                status_code == 429 or status_code >= 500
+            )
+
+        return isinstance(exception, (RequestsConnectionError, Timeout))
+
+    def _load(self) -> None:
+        if not self.state_file:
+            return
+
+        try:
+            state = json.loads(self.state_file.read_text(encoding="utf-8"))
+            self.failures = int(state["failures"])
+            self.opened_at = state["opened_at"]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            LOGGER.debug("Ignoring circuit breaker state file: %s", exception)
+
+    def _save(self) -> None:
+        if not self.state_file:
+            return
+
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(
+                json.dumps({"failures": self.failures, "opened_at": self.opened_at}),
+                encoding="utf-8",
+            )
+        except OSError as exception:
+            LOGGER.debug("Unable to save circuit breaker state: %s", exception)
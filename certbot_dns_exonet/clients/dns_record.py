@@ -0,0 +1,36 @@
+"""Minimal representation of an Exonet DNS record."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class DnsRecord:
+    """The fields of an Exonet DNS record needed by the plugin."""
+
+    id: str
+    type: str
+    name: str
+    content: str
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> DnsRecord:
+        """Create a DNS record from a JSON:API resource object.
+
+        Args:
+            data: The resource object, as found in the data of an API response.
+
+        Returns:
+            The DNS record.
+
+        """
+        attributes = data.get("attributes") or {}
+
+        return cls(
+            id=data["id"],
+            type=attributes.get("type", ""),
+            name=attributes.get("name", ""),
+            content=attributes.get("content", ""),
+        )
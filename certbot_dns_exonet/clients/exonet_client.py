@@ -2,15 +2,28 @@
 
 from __future__ import annotations
 
+import json
+from contextlib import contextmanager
 from logging import getLogger
-from typing import TYPE_CHECKING
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
 
 from certbot.errors import PluginError
 from exonetapi import Client
+from exonetapi.result import Parser
+from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.clients.dns_record import DnsRecord
+from certbot_dns_exonet.clients.response_cache import ResponseCache
+
 if TYPE_CHECKING:
-    from exonetapi.structures import ApiResource, ApiResourceSet
+    from collections.abc import Callable, Iterator
+
+    from exonetapi.structures import ApiResource
 
 
 LOGGER = getLogger(__name__)
@@ -20,16 +33,52 @@ class ExonetClient:
     """Encapsulates all communication with the Exonet API."""
 
     client: Client
+    circuit_breaker: CircuitBreaker
+    listeners: list[Callable[[str, float], None]]
+    response_cache: ResponseCache
+    session: Session
+    received_bytes: int
+
+    # Page size used when listing DNS records.
+    page_size = 500
 
-    def __init__(self, token: str) -> None:
+    # Timeout in seconds for requests made with the session.
+    timeout = 30
+
+    # Number of connections per host kept open by the session.
+    pool_size = 10
+
+    def __init__(
+        self,
+        token: str,
+        circuit_breaker: CircuitBreaker | None = None,
+        response_cache: ResponseCache | None = None,
+        pool_size: int | None = None,
+    ) -> None:
         """Exonet client constructor.
 
         Args:
             token: Exonet token.
+            circuit_breaker: The circuit breaker guarding the API calls. Defaults
+                to the breaker shared by all clients in this process.
+            response_cache: The cache used for conditional requests. Defaults to
+                the cache shared by all clients in this process.
+            pool_size: The number of connections per host kept open by the
+                session, which should cover the threads using the client at the
+                same time. Defaults to `pool_size`.
 
         """
         self.client = Client()
         self.client.authenticator.set_token(token)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker.shared()
+        self.response_cache = response_cache or ResponseCache.shared()
+        self.listeners = []
+        self.session = Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size or self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.received_bytes = 0
+        self._lock = Lock()
 
     def post_api_resource(self, resource: ApiResource) -> ApiResource:
         """Post the Exonet ApiResource.
@@ -38,14 +87,15 @@ class ExonetClient:
             resource: The Exonet ApiResource.
 
         Raises:
-            PluginError: When resource can not de added.
+            PluginError: When resource can not de added or the API is unavailable.
 
         Returns:
             ApiResource: The created Exonet ApiResource.
 
         """
         try:
-            return resource.post()
+            with self._api_call("post_api_resource"):
+                return resource.post()
         except HTTPError as exception:
             description = f": {exception.response.text}" if exception.response else ""
             error_message = f"Error adding {type(resource).__name__} using the Exonet API{description}"  # noqa: E501
@@ -58,10 +108,14 @@ class ExonetClient:
         Args:
             resource: The Exonet ApiResource.
 
+        Raises:
+            PluginError: When the API is unavailable.
+
         """
         try:
             LOGGER.debug("Deleting DNS record with id: %s", resource.id())
-            resource.delete()
+            with self._api_call("delete_api_resource"):
+                resource.delete()
         except HTTPError as exception:
             description = f": {exception.response.text}" if exception.response else ""
             LOGGER.warning(
@@ -71,30 +125,62 @@ class ExonetClient:
                 description,
             )
 
-    def get_relation(
-        self, resource: ApiResource, relation_name: str
-    ) -> ApiResourceSet | None:
-        """Get relation for ApiResource based on relation name.
+    def list_dns_records(self, zone_id: str) -> list[DnsRecord] | None:
+        """List all DNS records of a DNS zone.
+
+        This decodes the API response directly into minimal DNS records instead
+        of hydrating full ApiResources, requests only the needed fields and follows
+        the pagination.
 
         Args:
-            resource: The Exonet ApiResource.
-            relation_name: The name of the relation.
+            zone_id: The id of the DNS zone.
+
+        Raises:
+            PluginError: When the API is unavailable.
 
         Returns:
-            Optional[ApiResourceSet]: ApiResourceSet if found.
+            Optional[list[DnsRecord]]: The DNS records if found.
 
         """
+        url: str | None = f"{self.client.get_host()}/dns_zones/{zone_id}/records"
+        params: dict[str, str | int] | None = {
+            "fields[dns_records]": "type,name,content",
+            "page[size]": self.page_size,
+        }
+        records: list[DnsRecord] = []
+
         try:
-            return resource.related(relation_name).get()
+            while url:
+                with self._api_call("list_dns_records"):
+                    page_records, url = self.parse_dns_records(self._get(url, params))
+                records.extend(page_records)
+                # The next link already contains the query parameters.
+                params = None
         except HTTPError as exception:
             description = f": {exception.response.text}" if exception.response else ""
-            LOGGER.debug(
-                "Error getting %s from the Exonet API%s",
-                type(resource).__name__,
-                description,
-            )
+            LOGGER.debug("Error getting DNS records from the Exonet API%s", description)
             return None
 
+        return records
+
+    @staticmethod
+    def parse_dns_records(content: bytes) -> tuple[list[DnsRecord], str | None]:
+        """Parse a JSON:API DNS record listing.
+
+        Args:
+            content: The body of the API response.
+
+        Returns:
+            The DNS records and the link to the next page, if any.
+
+        """
+        document = json.loads(content)
+
+        return (
+            [DnsRecord.from_json(data) for data in document.get("data") or []],
+            (document.get("links") or {}).get("next"),
+        )
+
     def find_dns_zone_by_name(self, domain: str) -> ApiResource | None:
         """Find the domain resource for a given domain.
 
@@ -102,7 +188,7 @@ class ExonetClient:
             domain: The registered domain name.
 
         Raises:
-            PluginError: If no matching domain is found.
+            PluginError: If no matching domain is found or the API is unavailable.
 
         Returns:
             The domain, if found.
@@ -110,12 +196,11 @@ class ExonetClient:
         """
         try:
             # Get zone based on attribute name.
-            zones = (
-                self.client.resource("dns_zones")
-                .filter("name", domain)
-                .get()
-                .resources()
-            )
+            with self._api_call("find_dns_zone_by_name"):
+                content = self._get(
+                    f"{self.client.get_host()}/dns_zones", {"filter[name]": domain}
+                )
+            zones = Parser(content).parse().resources()
         except HTTPError as exception:
             status_code = exception.response.status_code if exception.response else None
             hint = "(Did you provide a valid API token?)" if status_code == 401 else ""
@@ -126,3 +211,64 @@ class ExonetClient:
             raise PluginError(error_message) from exception
 
         return zones[0] if zones else None
+
+    @contextmanager
+    def _api_call(self, name: str) -> Iterator[None]:
+        """Guard a call to the Exonet API and report its duration to the listeners.
+
+        Args:
+            name: The name of the call.
+
+        Yields:
+            Nothing, the call is made in the context.
+
+        """
+        start = perf_counter()
+        try:
+            with self.circuit_breaker:
+                yield
+        finally:
+            duration = perf_counter() - start
+            for listener in self.listeners:
+                listener(name, duration)
+
+    def _get(self, url: str, params: dict[str, Any] | None = None) -> bytes:
+        """Make a conditional GET request to the Exonet API using the session.
+
+        When a response for the same request is cached, the request is made
+        conditional on its validators and a 304 response returns the cached body.
+
+        Args:
+            url: The URL to get.
+            params: The query parameters.
+
+        Returns:
+            The body of the response.
+
+        """
+        token = self.client.authenticator.get_token()
+        key = self.response_cache.key(token, url, params)
+        cached = self.response_cache.get(key)
+
+        headers = {
+            "Accept": "application/vnd.Exonet.v1+json",
+            "Authorization": f"Bearer {token}",
+        }
+        if cached:
+            headers.update(cached.conditional_headers())
+
+        response = self.session.get(
+            url, headers=headers, params=params, timeout=self.timeout
+        )
+
+        if cached and response.status_code == 304:
+            LOGGER.debug("Using cached response for %s", url)
+            return cached.content
+
+        response.raise_for_status()
+        self.response_cache.store(key, response)
+
+        with self._lock:
+            self.received_bytes += len(response.content)
+
+        return response.content
@@ -0,0 +1,181 @@
+"""Cache of Exonet API responses used for conditional requests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING, Any, ClassVar
+
+if TYPE_CHECKING:
+    from requests import Response
+
+# Cache key: (token, url, sorted query parameters).
+CacheKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """The validators and body of a cached API response."""
+
+    etag: str | None
+    last_modified: str | None
+    content: bytes
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Get the headers that make a request conditional on this response.
+
+        Returns:
+            The If-None-Match and/or If-Modified-Since headers.
+
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """Cache of Exonet API responses used for conditional requests.
+
+    Responses carrying an ETag or Last-Modified validator are kept, so a later
+    request for the same URL can be made conditional. When the API answers with
+    304 Not Modified the cached body is used instead of downloading it again.
+
+    The cached bodies are bounded by `max_bytes`: the least recently used
+    responses are evicted first, their next request is simply not conditional.
+    """
+
+    max_bytes: int | None
+
+    _shared: ClassVar[ResponseCache | None] = None
+    _shared_lock: ClassVar[Lock] = Lock()
+
+    def __init__(self, max_bytes: int | None = 16 * 1024 * 1024) -> None:
+        """Response cache constructor.
+
+        Args:
+            max_bytes: The total size of the cached bodies, if bounded.
+
+        """
+        self.max_bytes = max_bytes
+        # Least recently used first.
+        self._responses: dict[CacheKey, CachedResponse] = {}
+        self._size = 0
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the cached bodies.
+
+        Returns:
+            The size in bytes.
+
+        """
+        with self._lock:
+            return self._size
+
+    @classmethod
+    def shared(cls) -> ResponseCache:
+        """Get the cache shared by all clients in this process.
+
+        Returns:
+            The shared cache.
+
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    @staticmethod
+    def key(token: str, url: str, params: dict[str, Any] | None) -> CacheKey:
+        """Get the cache key of a request.
+
+        Args:
+            token: The API token the request is made with.
+            url: The requested URL.
+            params: The query parameters.
+
+        Returns:
+            The cache key.
+
+        """
+        return (
+            token,
+            url,
+            tuple(sorted((name, str(value)) for name, value in (params or {}).items())),
+        )
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        """Get a cached response.
+
+        Args:
+            key: The cache key of the request.
+
+        Returns:
+            The cached response, if any.
+
+        """
+        with self._lock:
+            cached = self._responses.pop(key, None)
+            if cached is not None:
+                self._responses[key] = cached
+
+            return cached
+
+    def store(self, key: CacheKey, response: Response) -> None:
+        """Cache a response if it carries a validator.
+
+        Args:
+            key: The cache key of the request.
+            response: The successful API response.
+
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        with self._lock:
+            previous = self._responses.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+
+            if not etag and not last_modified:
+                return
+
+            self._responses[key] = CachedResponse(etag, last_modified, response.content)
+            self._size += len(response.content)
+
+            self._evict()
+
+    def limit(self, max_bytes: int) -> None:
+        """Lower the total size of the cached bodies, evicting responses if needed.
+
+        A budget that is already lower is kept, so the smallest limit set by any
+        user of a shared cache applies.
+
+        Args:
+            max_bytes: The total size of the cached bodies.
+
+        """
+        with self._lock:
+            if self.max_bytes is None or max_bytes < self.max_bytes:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._responses.clear()
+            self._size = 0
+
+    def _evict(self) -> None:
+        if self.max_bytes is None:
+            return
+
+        # Evict the least recently used responses, never the most recent one.
+        while self._size > self.max_bytes and len(self._responses) > 1:
+            self._size -= len(self._responses.pop(next(iter(self._responses))).content)
@@ -0,0 +1,10 @@
+"""Certbot DNS Exonet diagnostics."""
+
+from .profiler import Profiler
+from .tracer import ChallengeTrace, ChallengeTracer
+
+__all__ = [
+    "ChallengeTrace",
+    "ChallengeTracer",
+    "Profiler",
+]
@@ -0,0 +1,178 @@
+"""Profiler that captures CPU and memory hot spots of a plugin run."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+LOGGER = getLogger(__name__)
+
+
+class Profiler:
+    """Captures cProfile and tracemalloc data for a plugin run.
+
+    Sections of the run (e.g. perform and cleanup) are profiled using `profile`,
+    tasks running in worker threads (which cProfile does not follow before Python
+    3.12) using `profile_thread`, and the durations of the Exonet API calls are
+    collected using `record`. Calling `write_report` writes a text report and the
+    raw cProfile statistics (which can be opened using e.g. snakeviz) for the run
+    to the report directory.
+    """
+
+    directory: Path
+    sections: dict[str, float]
+    calls: dict[str, list[float]]
+
+    def __init__(self, directory: Path, top: int = 30) -> None:
+        """Profiler constructor.
+
+        Args:
+            directory: The directory to write the reports to.
+            top: The number of functions and allocations to include in the report.
+
+        """
+        self.directory = directory
+        self.sections = {}
+        self.calls = {}
+        self._top = top
+        self._profile = cProfile.Profile()
+        self._thread_stats: pstats.Stats | None = None
+        self._lock = Lock()
+        self._depth = 0
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def profile(self, section: str) -> Iterator[None]:
+        """Profile a section of the plugin run.
+
+        Args:
+            section: The name of the section.
+
+        Yields:
+            Nothing, the section is run in the context.
+
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        # Nested sections are part of the already enabled profile.
+        if not self._depth:
+            self._profile.enable()
+        self._depth += 1
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[section] = (
+                self.sections.get(section, 0.0) + perf_counter() - start
+            )
+            self._depth -= 1
+            if not self._depth:
+                self._profile.disable()
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        """Profile a task running in a worker thread.
+
+        The profile is merged into the CPU statistics of the report. As of Python
+        3.12, cProfile uses sys.monitoring, which follows all threads but allows
+        only a single active profiler, so the task is then part of the profile of
+        the section.
+
+        Yields:
+            Nothing, the task is run in the context.
+
+        """
+        if sys.version_info >= (3, 12):
+            yield
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                if self._thread_stats is None:
+                    self._thread_stats = pstats.Stats(profile)
+                else:
+                    self._thread_stats.add(profile)
+
+    def record(self, name: str, duration: float) -> None:
+        """Record the duration of an Exonet API call.
+
+        Args:
+            name: The name of the call.
+            duration: The duration in seconds.
+
+        """
+        self.calls.setdefault(name, []).append(duration)
+
+    def write_report(self) -> Path:
+        """Write the report of the run to the report directory.
+
+        Returns:
+            The path of the written report.
+
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"dns-exonet-{timestamp}-{os.getpid()}.txt"
+
+        report = io.StringIO()
+        report.write("Sections (wall time):\n")
+        for section, duration in self.sections.items():
+            report.write(f"  {section:<30} {duration:10.4f}s\n")
+
+        report.write("\nExonet API calls (count, total, max):\n")
+        for name, durations in self.calls.items():
+            report.write(
+                f"  {name:<30} {len(durations):6d} {sum(durations):10.4f}s "
+                f"{max(durations):10.4f}s\n"
+            )
+
+        report.write("\nCPU (cProfile, by cumulative time):\n")
+        if self.sections:
+            stats = pstats.Stats(self._profile, stream=report)
+            with self._lock:
+                if self._thread_stats is not None:
+                    stats.add(self._thread_stats)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+            stats.dump_stats(path.with_suffix(".prof"))
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report.write(
+                "\nMemory (tracemalloc):\n"
+                f"  current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n"
+            )
+            for statistic in tracemalloc.take_snapshot().statistics("lineno")[
+                : self._top
+            ]:
+                report.write(f"  {statistic}\n")
+
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+        path.write_text(report.getvalue(), encoding="utf-8")
+        LOGGER.info("Wrote Exonet plugin profile to %s", path)
+
+        return path
@@ -0,0 +1,196 @@
+"""Tracer that writes the timings of every challenge as JSON lines."""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging import getLogger
+from threading import Lock, local
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Iterator
+    from pathlib import Path
+
+    from certbot_dns_exonet.services.challenge_plan import ChallengePlan
+
+LOGGER = getLogger(__name__)
+
+# The traced phases of a challenge, in the order they happen.
+PHASES = ("zone_lookup", "create", "propagation", "delete")
+
+
+@dataclass(slots=True)
+class ChallengeTrace:
+    """The durations and Exonet API calls traced for a single challenge."""
+
+    durations: dict[str, float] = field(default_factory=dict)
+    api_calls: dict[str, int] = field(default_factory=dict)
+    api_time: float = 0.0
+
+    def merge(self, other: ChallengeTrace) -> None:
+        """Add the durations and API calls of another trace to this trace.
+
+        Args:
+            other: The trace to add.
+
+        """
+        for phase, duration in other.durations.items():
+            self.durations[phase] = self.durations.get(phase, 0.0) + duration
+        for name, count in other.api_calls.items():
+            self.api_calls[name] = self.api_calls.get(name, 0) + count
+        self.api_time += other.api_time
+
+
+class ChallengeTracer:
+    """Traces the phases of every challenge and writes them as JSON lines.
+
+    The work done for a challenge is traced using `span`, which times the phase
+    and attributes the Exonet API calls made in it (reported to `record`, in the
+    same thread) to the challenge. Work shared by several challenges, such as the
+    lookup of their DNS zone, is attributed to the challenge that triggered it,
+    so the traces of a run add up to the work actually done.
+
+    Calling `write` appends one JSON line per challenge of a plan to the trace
+    file, so traces of many runs and hosts can be aggregated.
+    """
+
+    path: Path
+
+    def __init__(self, path: Path) -> None:
+        """Tracer constructor.
+
+        Args:
+            path: The file to append the JSON lines to.
+
+        """
+        self.path = path
+        self._traces: dict[Hashable, ChallengeTrace] = {}
+        self._lock = Lock()
+        self._active = local()
+
+    @contextmanager
+    def span(self, key: Hashable, phase: str) -> Iterator[None]:
+        """Trace a phase of a challenge.
+
+        Args:
+            key: The challenge, or another key whose trace is merged later.
+            phase: The name of the phase.
+
+        Yields:
+            Nothing, the phase is run in the context.
+
+        """
+        trace = ChallengeTrace()
+        stack = self._stack()
+        stack.append(trace)
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            trace.durations[phase] = perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self._traces.setdefault(key, ChallengeTrace()).merge(trace)
+
+    def record(self, name: str, duration: float) -> None:
+        """Attribute an Exonet API call to the active span of this thread.
+
+        Args:
+            name: The name of the call.
+            duration: The duration in seconds.
+
+        """
+        stack = self._stack()
+        if not stack:
+            return
+
+        trace = stack[-1]
+        trace.api_calls[name] = trace.api_calls.get(name, 0) + 1
+        trace.api_time += duration
+
+    def add(self, keys: Iterable[Hashable], phase: str, duration: float) -> None:
+        """Add the duration of a phase shared by challenges, e.g. propagation.
+
+        Args:
+            keys: The challenges.
+            phase: The name of the phase.
+            duration: The duration in seconds.
+
+        """
+        with self._lock:
+            for key in keys:
+                self._traces.setdefault(key, ChallengeTrace()).merge(
+                    ChallengeTrace(durations={phase: duration})
+                )
+
+    def merge(self, source: Hashable, target: Hashable) -> None:
+        """Move the API calls of work done in advance to the challenge using it.
+
+        Only the API calls are moved: the work ran in the background, so its
+        duration is not part of the phases of the challenge.
+
+        Args:
+            source: The key the work was traced with.
+            target: The challenge.
+
+        """
+        with self._lock:
+            trace = self._traces.pop(source, None)
+            if trace:
+                self._traces.setdefault(target, ChallengeTrace()).merge(
+                    ChallengeTrace(api_calls=trace.api_calls, api_time=trace.api_time)
+                )
+
+    def write(self, plan: ChallengePlan) -> None:
+        """Append the traces of the challenges of a plan to the trace file.
+
+        Args:
+            plan: The plan of the traced challenges.
+
+        """
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        lines = []
+        with self._lock:
+            for record in plan:
+                trace = self._traces.pop(record.challenge, ChallengeTrace())
+                lines.append(
+                    json.dumps(
+                        {
+                            "time": timestamp,
+                            "pid": os.getpid(),
+                            "domain": record.domain,
+                            "validation_name": record.validation_name,
+                            "zone": record.zone_name,
+                            "record_id": record.record_id,
+                            **{
+                                phase: round(trace.durations.get(phase, 0.0), 6)
+                                for phase in PHASES
+                            },
+                            "api_calls": sum(trace.api_calls.values()),
+                            "api_time": round(trace.api_time, 6),
+                            "api_calls_by_name": trace.api_calls,
+                        }
+                    )
+                    + "\n"
+                )
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as trace_file:
+                trace_file.write("".join(lines))
+        except OSError as exception:
+            LOGGER.warning("Unable to write challenge trace: %s", exception)
+
+    def _stack(self) -> list[ChallengeTrace]:
+        stack: list[ChallengeTrace] | None = getattr(self._active, "stack", None)
+        if stack is None:
+            stack = self._active.stack = []
+
+        return stack
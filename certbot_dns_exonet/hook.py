@@ -0,0 +1,298 @@
+"""Stand-alone auth and cleanup hook using the Exonet API.
+
+The hook can be used as `--manual-auth-hook` and `--manual-cleanup-hook` of
+certbot, reading the challenge from the CERTBOT_DOMAIN and CERTBOT_VALIDATION
+environment variables, or by other ACME clients and scripts, reading a batch of
+challenges from stdin. It only imports what is needed to talk to the Exonet API,
+so it starts a lot faster than certbot with the plugin.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+from argparse import ArgumentParser
+from dataclasses import asdict
+from pathlib import Path
+from time import sleep
+from typing import TYPE_CHECKING, TextIO
+
+from certbot.errors import PluginError
+
+from certbot_dns_exonet.arguments import positive_int
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
+from certbot_dns_exonet.services.dns_service import DnsService
+from certbot_dns_exonet.services.zone_coordinator import ZoneCoordinator
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from collections.abc import Iterable, Iterator
+
+    from certbot_dns_exonet.services.challenge_plan import Challenge
+
+LOGGER = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the hook.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv.
+
+    Returns:
+        The exit code.
+
+    """
+    args = _parser().parse_args(argv)
+
+    logging.basicConfig(
+        format="%(levelname)s: %(message)s",
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+    )
+
+    try:
+        dns_service = DnsService(
+            _token(args.credentials),
+            CircuitBreaker.shared(args.circuit_breaker_state),
+            ZoneCoordinator(args.coordination_dir) if args.coordination_dir else None,
+            memory_ceiling=(
+                args.memory_ceiling * 1024 * 1024 if args.memory_ceiling else None
+            ),
+        )
+
+        try:
+            if args.action == "auth":
+                auth(dns_service, args, sys.stdin, sys.stdout, sys.stderr)
+            else:
+                cleanup(dns_service, args, sys.stdin)
+        finally:
+            dns_service.close()
+    except PluginError as exception:
+        sys.stderr.write(f"Error: {exception}\n")
+        return 1
+
+    return 0
+
+
+def auth(
+    dns_service: DnsService,
+    args: Namespace,
+    stdin: TextIO,
+    stdout: TextIO,
+    stderr: TextIO,
+) -> None:
+    """Create the TXT records for the challenges.
+
+    The created records are written to stdout as JSON lines, which can be passed
+    to the cleanup (certbot does so using CERTBOT_AUTH_OUTPUT) to delete them
+    without looking them up again. A batch is read and performed in chunks, and
+    the records of every chunk are written as soon as it is done, so very large
+    batches use bounded memory. When running dry, only the DNS zones are looked
+    up and the estimated Exonet API load is written to stderr instead, so it does
+    not end up in the records passed to the cleanup.
+
+    Args:
+        dns_service: The DNS service.
+        args: The parsed command line arguments.
+        stdin: Input to read a batch of challenges from.
+        stdout: Output to write the created records to.
+        stderr: Output to write the estimate of a dry run to.
+
+    Raises:
+        PluginError: When running dry, after writing the estimate.
+
+    """
+    challenges = _read_challenges(stdin) if args.batch else [_env_challenge()]
+
+    if args.dry_run:
+        stderr.write(dns_service.estimate_txt_records(challenges).report() + "\n")
+        # Fail, as no records were created for the challenges.
+        msg = "Dry run, no DNS records were created."
+        raise PluginError(msg)
+
+    try:
+        for plan in dns_service.perform_txt_records_chunked(
+            challenges, args.chunk_size
+        ):
+            _write_records(plan, stdout)
+    except IncompletePlanError as error:
+        # Let the cleanup delete the records created before the failure.
+        _write_records(error.plan, stdout)
+        raise
+
+    if args.propagation_seconds:
+        LOGGER.info(
+            "Waiting %d seconds for DNS changes to propagate", args.propagation_seconds
+        )
+        sleep(args.propagation_seconds)
+
+
+def cleanup(dns_service: DnsService, args: Namespace, stdin: TextIO) -> None:
+    """Delete the TXT records for the challenges.
+
+    Args:
+        dns_service: The DNS service.
+        args: The parsed command line arguments.
+        stdin: Input to read a batch of challenges or created records from.
+
+    """
+    if args.batch:
+        lines = stdin.readlines()
+    else:
+        lines = os.environ.get("CERTBOT_AUTH_OUTPUT", "").splitlines()
+
+    # Records written by the auth hook are deleted without looking them up.
+    records = _read_records(line for line in lines if line.startswith("{"))
+    challenges = [] if records or args.batch else [_env_challenge()]
+    challenges += _read_challenges(line for line in lines if not line.startswith("{"))
+
+    dns_service.del_txt_records_chunked(records, args.chunk_size)
+    dns_service.del_txt_records_chunked(
+        (
+            record
+            for plan in dns_service.plan_txt_records_chunked(
+                challenges, args.chunk_size
+            )
+            for record in plan
+        ),
+        args.chunk_size,
+    )
+
+
+def _parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="certbot-dns-exonet-hook",
+        description="Create or delete dns-01 challenge TXT records using the "
+        "Exonet API. Without --batch the challenge is read from the "
+        "CERTBOT_DOMAIN and CERTBOT_VALIDATION environment variables.",
+    )
+    parser.add_argument("action", choices=["auth", "cleanup"])
+    parser.add_argument(
+        "--credentials",
+        type=Path,
+        help="Exonet credentials INI file. Defaults to the EXONET_API_TOKEN "
+        "environment variable.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read challenges from stdin, one 'DOMAIN VALIDATION' or "
+        "'DOMAIN VALIDATION_NAME VALIDATION' per line. The cleanup also accepts "
+        "the output of the auth hook.",
+    )
+    parser.add_argument(
+        "--propagation-seconds",
+        type=int,
+        default=10,
+        help="The number of seconds to wait for DNS to propagate after creating "
+        "the records. (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--circuit-breaker-state",
+        type=Path,
+        help="File to keep the Exonet API circuit breaker state in, so consecutive "
+        "hook runs fail fast while the API is unavailable.",
+    )
+    parser.add_argument(
+        "--coordination-dir",
+        type=Path,
+        help="Directory shared by concurrent processes to lock DNS zones and "
+        "share their DNS record listings.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only look up the DNS zones and write the predicted number of Exonet "
+        "API calls and bytes of the auth and cleanup to stderr, without creating "
+        "records. Exits with status 1, as the challenges can not succeed.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DnsService.chunk_size,
+        help="The number of challenges created or deleted at once, bounding the "
+        "memory used for very large batches. (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-ceiling",
+        type=positive_int,
+        help="The approximate memory in MiB the cached DNS record listings and "
+        "Exonet API responses may use, evicting the least recently used.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log debug output.")
+
+    return parser
+
+
+def _token(credentials: Path | None) -> str:
+    if not credentials:
+        token = os.environ.get("EXONET_API_TOKEN")
+        if not token:
+            msg = "Provide --credentials or the EXONET_API_TOKEN environment variable."
+            raise PluginError(msg)
+
+        return token
+
+    try:
+        lines = credentials.read_text(encoding="utf-8").splitlines()
+    except OSError as exception:
+        msg = f"Unable to read credentials file {credentials}: {exception}"
+        raise PluginError(msg) from exception
+
+    for line in lines:
+        key, _, value = line.partition("=")
+        if key.strip() == "dns_exonet_token":
+            return value.strip()
+
+    msg = f"Missing dns_exonet_token in credentials file {credentials}."
+    raise PluginError(msg)
+
+
+def _env_challenge() -> Challenge:
+    domain = os.environ.get("CERTBOT_DOMAIN")
+    validation = os.environ.get("CERTBOT_VALIDATION")
+
+    if not domain or not validation:
+        msg = "CERTBOT_DOMAIN and CERTBOT_VALIDATION must be set, or use --batch."
+        raise PluginError(msg)
+
+    return domain, f"_acme-challenge.{domain}", validation
+
+
+def _read_challenges(lines: Iterable[str]) -> Iterator[Challenge]:
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+
+        if len(fields) == 2:
+            yield fields[0], f"_acme-challenge.{fields[0]}", fields[1]
+        elif len(fields) == 3:
+            yield fields[0], fields[1], fields[2]
+        else:
+            msg = f"Invalid challenge: {line.strip()}"
+            raise PluginError(msg)
+
+
+def _write_records(plan: ChallengePlan, stdout: TextIO) -> None:
+    stdout.writelines(json.dumps(asdict(planned)) + "\n" for planned in plan)
+    stdout.flush()
+
+
+def _read_records(lines: Iterable[str]) -> list[PlannedRecord]:
+    try:
+        return [PlannedRecord(**json.loads(line)) for line in lines]
+    except (ValueError, TypeError) as exception:
+        msg = f"Invalid record in auth hook output: {exception}"
+        raise PluginError(msg) from exception
+
+
+if __name__ == "__main__":
+    sys.exit(main())
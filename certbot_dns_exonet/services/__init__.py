@@ -1,7 +1,17 @@
 """Certbot DNS Exonet services."""
 
+from .challenge_plan import ChallengePlan, IncompletePlanError, PlannedRecord
+from .cost_estimate import CostEstimate
 from .dns_service import DnsService
+from .record_index import RecordIndex
+from .zone_coordinator import ZoneCoordinator
 
 __all__ = [
+    "ChallengePlan",
+    "CostEstimate",
     "DnsService",
+    "IncompletePlanError",
+    "PlannedRecord",
+    "RecordIndex",
+    "ZoneCoordinator",
 ]
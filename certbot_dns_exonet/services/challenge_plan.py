@@ -0,0 +1,132 @@
+"""Precomputed plan for a batch of dns-01 challenges."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+
+from certbot.errors import PluginError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# A challenge as handed to the plugin: (domain, validation_name, validation).
+Challenge = tuple[str, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedRecord:
+    """A single TXT record that is (or will be) created for a challenge."""
+
+    domain: str
+    validation_name: str
+    validation: str
+    zone_id: str
+    zone_name: str
+    name: str
+    content: str
+    record_id: str | None = None
+    # The registered domain the DNS zone was looked up for.
+    registered_domain: str = ""
+
+    @property
+    def challenge(self) -> Challenge:
+        """Get the challenge this record was planned for.
+
+        Returns:
+            The (domain, validation_name, validation) tuple.
+
+        """
+        return self.domain, self.validation_name, self.validation
+
+    def created(self, record_id: str) -> PlannedRecord:
+        """Get a copy of this planned record with the created record id.
+
+        Args:
+            record_id: The id of the record created using the Exonet API.
+
+        Returns:
+            The planned record including the record id.
+
+        """
+        return replace(self, record_id=record_id)
+
+
+@dataclass(frozen=True, slots=True)
+class ChallengePlan:
+    """An immutable plan of TXT records for a batch of challenges.
+
+    The plan is computed once when performing the challenges and reused as-is
+    when cleaning up, so zone lookups and record name/content computations are
+    not repeated.
+    """
+
+    records: tuple[PlannedRecord, ...] = ()
+
+    def __iter__(self) -> Iterator[PlannedRecord]:
+        """Iterate over the planned records.
+
+        Returns:
+            Iterator over the planned records.
+
+        """
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        """Get the number of planned records.
+
+        Returns:
+            The number of planned records.
+
+        """
+        return len(self.records)
+
+    def zones(self) -> dict[str, tuple[PlannedRecord, ...]]:
+        """Group the planned records by DNS zone id.
+
+        Returns:
+            The planned records per zone id, in plan order.
+
+        """
+        grouped: dict[str, list[PlannedRecord]] = {}
+        for record in self.records:
+            grouped.setdefault(record.zone_id, []).append(record)
+
+        return {zone_id: tuple(records) for zone_id, records in grouped.items()}
+
+    def select(self, challenges: list[Challenge]) -> ChallengePlan:
+        """Get the part of the plan covering the given challenges.
+
+        Args:
+            challenges: The challenges to select.
+
+        Returns:
+            A plan containing only the records for the given challenges.
+
+        """
+        wanted = set(challenges)
+
+        return ChallengePlan(
+            tuple(record for record in self.records if record.challenge in wanted)
+        )
+
+
+class IncompletePlanError(PluginError):
+    """Raised when not all TXT records of a batch of challenges could be created.
+
+    The plan holds the records planned before the failure, including the ids of
+    the records that were created, so they can still be cleaned up.
+    """
+
+    plan: ChallengePlan
+
+    def __init__(self, message: str, plan: ChallengePlan) -> None:
+        """Incomplete plan error constructor.
+
+        Args:
+            message: The error message.
+            plan: The records planned before the failure.
+
+        """
+        super().__init__(message)
+        self.plan = plan
@@ -0,0 +1,56 @@
+"""Estimate of the Exonet API load of performing a batch of challenges."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from certbot_dns_exonet.services.challenge_plan import ChallengePlan
+
+
+@dataclass(frozen=True, slots=True)
+class CostEstimate:
+    """The predicted Exonet API calls and bytes of performing and cleaning up a plan.
+
+    Bytes are the sizes of the request and response bodies; HTTP headers are not
+    included.
+    """
+
+    plan: ChallengePlan = field(default_factory=ChallengePlan)
+    calls: dict[str, int] = field(default_factory=dict)
+    sent_bytes: int = 0
+    received_bytes: int = 0
+
+    @property
+    def total_calls(self) -> int:
+        """Get the total number of predicted API calls.
+
+        Returns:
+            The number of API calls.
+
+        """
+        return sum(self.calls.values())
+
+    def report(self) -> str:
+        """Format the estimate for the user.
+
+        Returns:
+            The report.
+
+        """
+        lines = [
+            (
+                f"Dry run: {len(self.plan)} TXT records in {len(self.plan.zones())} "
+                "DNS zones would be created and deleted."
+            ),
+            f"Predicted Exonet API calls: {self.total_calls}",
+        ]
+        lines.extend(f"  {name}: {count}" for name, count in self.calls.items())
+        lines.append(
+            f"Predicted bytes: {self.sent_bytes} sent, {self.received_bytes} received"
+        )
+        lines.extend(
+            f"  {record.zone_name}: {record.name} {record.content}"
+            for record in self.plan
+        )
+
+        return "\n".join(lines)
@@ -1,29 +1,402 @@
 """Service containing all DNS logic."""
 
+from __future__ import annotations
+
+import json
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from itertools import islice
 from logging import getLogger
+from threading import Lock
+from typing import TYPE_CHECKING, TypeVar
 
 from certbot.errors import PluginError
 from exonetapi.structures import ApiResource
+from requests.exceptions import RequestException
 from tldextract import extract
 
+from certbot_dns_exonet.clients.dns_record import DnsRecord
 from certbot_dns_exonet.clients.exonet_client import ExonetClient
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
+from certbot_dns_exonet.services.cost_estimate import CostEstimate
+from certbot_dns_exonet.services.record_index import RecordIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Iterator
+
+    from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+    from certbot_dns_exonet.diagnostics.profiler import Profiler
+    from certbot_dns_exonet.diagnostics.tracer import ChallengeTracer
+    from certbot_dns_exonet.services.challenge_plan import Challenge
+    from certbot_dns_exonet.services.zone_coordinator import ZoneCoordinator
 
 LOGGER = getLogger(__name__)
 
+_T = TypeVar("_T")
+
 
 class DnsService:
     """Service containing all DNS logic."""
 
     client: ExonetClient
-
-    def __init__(self, token: str) -> None:
+    coordinator: ZoneCoordinator | None
+    tracer: ChallengeTracer | None
+    profiler: Profiler | None
+    index: RecordIndex
+
+    # Number of threads used to prefetch DNS zones.
+    prefetch_workers = 8
+
+    # Number of registered domains performed at the same time.
+    pipeline_workers = 32
+
+    # Number of challenges handled at once by the chunked methods.
+    chunk_size = 500
+
+    def __init__(
+        self,
+        token: str,
+        circuit_breaker: CircuitBreaker | None = None,
+        coordinator: ZoneCoordinator | None = None,
+        tracer: ChallengeTracer | None = None,
+        memory_ceiling: int | None = None,
+    ) -> None:
         """DNS service constructor.
 
         Args:
             token: The Exonet API token.
+            circuit_breaker: The circuit breaker guarding the Exonet API calls.
+            coordinator: Coordinator shared with concurrent processes, if any.
+            tracer: Tracer of the work done per challenge, if any.
+            memory_ceiling: The approximate memory in bytes the record index and
+                the response cache may use together. The budget of the response
+                cache shared by the process is lowered to match.
+
+        """
+        # Every prefetch and pipeline thread may use a connection at the same time.
+        self.client = ExonetClient(
+            token,
+            circuit_breaker,
+            pool_size=self.prefetch_workers + self.pipeline_workers,
+        )
+        # Split the memory ceiling between the record listings and responses.
+        budget = memory_ceiling // 2 if memory_ceiling is not None else None
+        if budget is not None:
+            self.client.response_cache.limit(budget)
+        self.coordinator = coordinator
+        self.tracer = tracer
+        if tracer:
+            self.client.listeners.append(tracer.record)
+        self.index = RecordIndex(budget)
+        # Profiler of the tasks run in worker threads, if any.
+        self.profiler = None
+        self._zones: dict[str, Future[ApiResource | None]] = {}
+        self._zones_lock = Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def prefetch_zones(self, domain_names: Iterable[str]) -> None:
+        """Look up the DNS zones of domains in the background.
+
+        The lookups run in parallel while the caller continues, e.g. with the
+        ACME order setup, and also open the connection to the Exonet API. Planning
+        TXT records for these domains later uses the prefetched zones.
+
+        Args:
+            domain_names: The domains to look up the DNS zones for.
+
+        """
+        self._prefetch({extract(name).registered_domain for name in domain_names})
+
+    def close(self) -> None:
+        """Shut down the threads used to prefetch DNS zones.
+
+        Prefetches still running complete in the background. The service can
+        still be used, zones are then looked up when needed.
+        """
+        with self._zones_lock:
+            executor, self._executor = self._executor, None
+
+        if executor:
+            executor.shutdown(wait=False)
+
+    def plan_txt_records(
+        self, challenges: Iterable[Challenge], domain: str | None = None
+    ) -> ChallengePlan:
+        """Compute the TXT records needed for a batch of challenges.
+
+        Each DNS zone is looked up only once, regardless of the number of
+        challenges that use it, and zones that are prefetched are not looked up
+        again.
+
+        Args:
+            challenges: The (domain, validation_name, validation) tuples.
+            domain: The registered domain of all challenges, if already known.
+
+        Raises:
+            PluginError: If no DNS zone is found for one of the domains.
+
+        Returns:
+            The plan of TXT records to create.
+
+        """
+        return self._plan_txt_records(
+            (domain or extract(challenge[0]).registered_domain, challenge)
+            for challenge in challenges
+        )
+
+    def plan_txt_records_chunked(
+        self, challenges: Iterable[Challenge], chunk_size: int | None = None
+    ) -> Iterator[ChallengePlan]:
+        """Compute the TXT records for a very large batch of challenges in chunks.
+
+        Args:
+            challenges: The (domain, validation_name, validation) tuples, which
+                may be a generator.
+            chunk_size: The number of challenges per chunk, defaults to
+                `chunk_size`.
+
+        Raises:
+            PluginError: If no DNS zone is found for one of the domains.
+
+        Yields:
+            The plan of every chunk.
 
         """
-        self.client = ExonetClient(token)
+        for chunk in self._chunks(challenges, chunk_size):
+            yield self.plan_txt_records(chunk)
+
+    def perform_txt_records(self, challenges: Iterable[Challenge]) -> ChallengePlan:
+        """Plan and create the TXT records for a batch of challenges.
+
+        The challenges are pipelined per registered domain: the DNS zones of all
+        domains are looked up concurrently, and the records of a zone are created
+        as soon as the zone is found. The total time tracks the slowest zone
+        rather than the sum of all zones.
+
+        Args:
+            challenges: The (domain, validation_name, validation) tuples.
+
+        Raises:
+            IncompletePlanError: If a DNS zone is not found, a record can not be
+                created or another error occurs. The records of the other domains
+                are still created, and the plan of the error holds all records
+                planned for the cleanup.
+
+        Returns:
+            The plan including the ids of the created records.
+
+        """
+        domains: dict[str, list[int]] = {}
+        challenges = list(challenges)
+        for position, challenge in enumerate(challenges):
+            domains.setdefault(extract(challenge[0]).registered_domain, []).append(
+                position
+            )
+
+        if len(domains) <= 1:
+            try:
+                return self._perform_domain(next(iter(domains), ""), challenges)
+            except IncompletePlanError:
+                raise
+            except Exception as exception:
+                raise IncompletePlanError(
+                    str(exception), ChallengePlan()
+                ) from exception
+
+        with ThreadPoolExecutor(
+            min(self.pipeline_workers, len(domains)),
+            thread_name_prefix="dns-exonet-pipeline",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._pipeline_domain, domain, [challenges[i] for i in positions]
+                ): positions
+                for domain, positions in domains.items()
+            }
+            wait(futures)
+
+        # Combine the plans of the domains in the order of the challenges.
+        planned: dict[int, PlannedRecord] = {}
+        errors: list[BaseException] = []
+        for future, positions in futures.items():
+            error = future.exception()
+            if isinstance(error, IncompletePlanError):
+                planned.update(zip(positions, error.plan, strict=True))
+            elif error is None:
+                planned.update(zip(positions, future.result(), strict=True))
+
+            # Any error is raised with the plans of the other domains.
+            if error:
+                errors.append(error)
+
+        plan = ChallengePlan(tuple(planned[i] for i in sorted(planned)))
+        if errors:
+            raise IncompletePlanError(str(errors[0]), plan) from errors[0]
+
+        return plan
+
+    def perform_txt_records_chunked(
+        self, challenges: Iterable[Challenge], chunk_size: int | None = None
+    ) -> Iterator[ChallengePlan]:
+        """Plan and create the TXT records for a very large batch of challenges.
+
+        The challenges are read and performed in chunks, so memory use does not
+        grow with the size of the batch. After each chunk the DNS zones and record
+        listings of the previous chunk that it did not use are evicted.
+
+        Args:
+            challenges: The (domain, validation_name, validation) tuples, which
+                may be a generator.
+            chunk_size: The number of challenges per chunk, defaults to
+                `chunk_size`.
+
+        Raises:
+            IncompletePlanError: If a chunk is not performed completely, see
+                `perform_txt_records`. Later chunks are not performed.
+
+        Yields:
+            The plan of every chunk, including the ids of the created records.
+
+        """
+        previous = ChallengePlan()
+
+        for chunk in self._chunks(challenges, chunk_size):
+            plan = self.perform_txt_records(chunk)
+            self._evict(previous, plan)
+            yield plan
+            previous = plan
+
+        self._evict(previous, ChallengePlan())
+
+    def estimate_txt_records(self, challenges: Iterable[Challenge]) -> CostEstimate:
+        """Estimate the Exonet API load of a batch of challenges, without writing.
+
+        The DNS zones are looked up (concurrently) to compute the plan, which only
+        reads from the Exonet API. The calls and bytes of creating the records and
+        deleting them again during the cleanup are predicted from the plan.
+
+        Args:
+            challenges: The (domain, validation_name, validation) tuples.
+
+        Raises:
+            PluginError: If no DNS zone is found for one of the domains.
+
+        Returns:
+            The estimate, including the plan.
+
+        """
+        domain_challenges = [
+            (extract(challenge[0]).registered_domain, challenge)
+            for challenge in challenges
+        ]
+        self._prefetch({domain for domain, _ in domain_challenges})
+        plan = self._plan_txt_records(domain_challenges)
+
+        # The request and response bodies of creating the records, as serialized
+        # by exonetapi. A created record is returned with its id and link.
+        host = self.client.client.get_host()
+        sent = received = 0
+        for planned in plan:
+            record = self._txt_record(planned).to_json()
+            sent += len(json.dumps({"data": record}))
+            record["id"] = "x" * 12
+            record["links"] = {"self": f"{host}/dns_records/{record['id']}"}
+            received += len(json.dumps({"data": record}))
+
+        return CostEstimate(
+            plan=plan,
+            calls={
+                "find_dns_zone_by_name": len(
+                    {record.registered_domain for record in plan}
+                ),
+                "post_api_resource": len(plan),
+                # The cleanup deletes the records by their id, without listing.
+                "delete_api_resource": len(plan),
+            },
+            sent_bytes=sent,
+            received_bytes=received + self.client.received_bytes,
+        )
+
+    def add_txt_records(self, plan: ChallengePlan) -> ChallengePlan:
+        """Create the TXT records of a plan.
+
+        Args:
+            plan: The plan computed by `plan_txt_records`.
+
+        Raises:
+            IncompletePlanError: If a record can not be created. The plan of the
+                error includes the ids of the records created before the failure.
+
+        Returns:
+            The plan including the ids of the created records.
+
+        """
+        created: dict[PlannedRecord, PlannedRecord] = {}
+
+        try:
+            for zone_id, planned_records in plan.zones().items():
+                self._add_zone_txt_records(zone_id, planned_records, created)
+        except Exception as exception:
+            raise IncompletePlanError(
+                str(exception),
+                ChallengePlan(tuple(created.get(planned, planned) for planned in plan)),
+            ) from exception
+
+        return ChallengePlan(tuple(created[planned] for planned in plan))
+
+    def del_txt_records(self, plan: ChallengePlan) -> None:
+        """Delete the TXT records of a plan.
+
+        Records with a known id are deleted directly. The other records are
+        matched on their name and content, to ensure that similar records created
+        concurrently (e.g., due to concurrent invocations of this plugin) are not
+        deleted. They are looked up in the record index, which knows the records
+        created by this service; only when a record is not found there the DNS zone
+        is listed, once per run.
+
+        Records the Exonet API fails to delete are logged, but not raised.
+
+        Args:
+            plan: The plan returned by `add_txt_records` or `plan_txt_records`.
+
+        Raises:
+             PluginError: If no DNS records are found for a zone, or the Exonet API
+                is unavailable.
+
+        """
+        for zone_id, planned_records in plan.zones().items():
+            self._del_zone_txt_records(zone_id, planned_records)
+
+    def del_txt_records_chunked(
+        self, records: Iterable[PlannedRecord], chunk_size: int | None = None
+    ) -> None:
+        """Delete the TXT records of a very large plan in chunks.
+
+        Like `perform_txt_records_chunked`, the DNS zones and record listings of
+        the previous chunk that a chunk did not use are evicted after it.
+
+        Args:
+            records: The planned records, which may be a generator.
+            chunk_size: The number of records per chunk, defaults to `chunk_size`.
+
+        Raises:
+             PluginError: If no DNS records are found for a zone, or the Exonet API
+                is unavailable.
+
+        """
+        previous = ChallengePlan()
+
+        for chunk in self._chunks(records, chunk_size):
+            plan = ChallengePlan(tuple(chunk))
+            self.del_txt_records(plan)
+            self._evict(previous, plan)
+            previous = plan
+
+        self._evict(previous, ChallengePlan())
 
     def add_txt_record(
         self, domain_name: str, record_name: str, record_content: str
@@ -39,34 +412,10 @@ class DnsService:
              PluginError: PluginError: If an error occurs while finding DNS zone.
 
         """
-        # Convert to registered domain.
-        domain = extract(domain_name).registered_domain
-
-        # Find the DNS zone.
-        zone = self.client.find_dns_zone_by_name(domain)
-
-        # If a zone is found, raise exception.
-        if not zone:
-            msg = f"Unable to find DNS zone for {domain_name}. Zone {domain} not found."
-            raise PluginError(msg)
-
-        LOGGER.debug(
-            "Found DNS zone %s for domain %s", zone.attribute("name"), domain_name
+        self.add_txt_records(
+            self.plan_txt_records([(domain_name, record_name, record_content)])
         )
 
-        LOGGER.debug("Adding TXT record to DNS.")
-
-        # Add the TXT record to the DNS.
-        record = ApiResource("dns_records")
-        record.attribute("type", "TXT")
-        record.attribute("name", self._compute_record_name(zone, record_name))
-        record.attribute("content", self._compute_record_content(record_content))
-        record.attribute("ttl", 3600)
-        record.relationship("zone", zone)
-        created_record = self.client.post_api_resource(record)
-
-        LOGGER.debug("Successfully added TXT record with id: %s", created_record.id())
-
     def del_txt_record(
         self, domain_name: str, record_name: str, record_content: str
     ) -> None:
@@ -76,7 +425,7 @@ class DnsService:
         similar records created concurrently
         (e.g., due to concurrent invocations of this plugin) are not deleted.
 
-        Failures are logged, but not raised.
+        Records the Exonet API fails to delete are logged, but not raised.
 
         Args:
             domain_name: The domain to use to associate the record with.
@@ -84,36 +433,405 @@ class DnsService:
             record_content: The record content (typically the challenge validation).
 
         Raises:
-             PluginError: PluginError: If no DNS records are found for a domain.
+             PluginError: PluginError: If no DNS records are found for a domain, or
+                the Exonet API is unavailable.
+
+        """
+        self.del_txt_records(
+            self.plan_txt_records([(domain_name, record_name, record_content)])
+        )
+
+    def _add_zone_txt_records(
+        self,
+        zone_id: str,
+        planned_records: tuple[PlannedRecord, ...],
+        created: dict[PlannedRecord, PlannedRecord],
+    ) -> None:
+        """Create the planned TXT records of a single DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            planned_records: The planned records of the zone.
+            created: The planned records including the ids of the created records,
+                added to as records are created.
+
+        """
+        zone_created: list[PlannedRecord] = []
+
+        with self._zone_lock(zone_id), self._record_created(zone_id, zone_created):
+            for planned in planned_records:
+                LOGGER.debug("Adding TXT record to DNS.")
+
+                # Add the TXT record to the DNS.
+                with self._trace(planned.challenge, "create"):
+                    created_record = self.client.post_api_resource(
+                        self._txt_record(planned)
+                    )
+
+                LOGGER.debug(
+                    "Successfully added TXT record with id: %s", created_record.id()
+                )
+
+                created[planned] = planned.created(created_record.id())
+                zone_created.append(created[planned])
+
+    @staticmethod
+    def _txt_record(planned: PlannedRecord) -> ApiResource:
+        """Build the TXT record resource to create for a planned record.
+
+        Args:
+            planned: The planned record.
+
+        Returns:
+            The Exonet ApiResource of the record.
+
+        """
+        record = ApiResource("dns_records")
+        record.attribute("type", "TXT")
+        record.attribute("name", planned.name)
+        record.attribute("content", planned.content)
+        record.attribute("ttl", 3600)
+        record.relationship("zone", ApiResource("dns_zones", planned.zone_id))
+
+        return record
+
+    @contextmanager
+    def _record_created(
+        self, zone_id: str, created: list[PlannedRecord]
+    ) -> Iterator[None]:
+        """Index the records created in the context, also when creating fails.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            created: The created records, added to in the context.
+
+        Yields:
+            Nothing, the records are created in the context.
+
+        """
+        try:
+            yield
+        finally:
+            created_records = [
+                DnsRecord(str(planned.record_id), "TXT", planned.name, planned.content)
+                for planned in created
+            ]
+            self.index.add(zone_id, created_records)
+
+            if self.coordinator:
+                self.coordinator.records_created(zone_id, created_records)
+
+    def _del_zone_txt_records(
+        self, zone_id: str, planned_records: tuple[PlannedRecord, ...]
+    ) -> None:
+        """Delete the planned TXT records of a single DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            planned_records: The planned records of the zone.
+
+        Raises:
+             PluginError: If no DNS records are found for the zone, or the Exonet API
+                is unavailable.
+
+        """
+        with self._zone_lock(zone_id):
+            wanted = dict.fromkeys(
+                ("TXT", planned.name, planned.content)
+                for planned in planned_records
+                if not planned.record_id
+            )
+
+            # Look up the records in the index, listing the zone if needed.
+            with self._trace(planned_records[0].challenge, "delete"):
+                found = self.index.find(zone_id, wanted)
+                if len(found) < len(wanted) and not self.index.is_seeded(zone_id):
+                    # Get DNS records for DNS zone.
+                    domain_records = self._list_records(zone_id)
+
+                    # If no records are found raise exception.
+                    if not domain_records:
+                        msg = (
+                            "Unable to find DNS records for "
+                            f"{planned_records[0].zone_name}."
+                        )
+                        raise PluginError(msg)
+
+                    self.index.seed(zone_id, domain_records)
+                    found = self.index.find(zone_id, wanted)
+
+            deleted: dict[str, None] = {}
+            try:
+                for planned in planned_records:
+                    # Delete the record if its id is known, else all matching ones.
+                    record_ids = (
+                        [planned.record_id]
+                        if planned.record_id
+                        else found.get(("TXT", planned.name, planned.content), [])
+                    )
+
+                    with self._trace(planned.challenge, "delete"):
+                        for record_id in record_ids:
+                            if record_id not in deleted:
+                                self.client.delete_api_resource(
+                                    ApiResource("dns_records", record_id)
+                                )
+                                deleted[record_id] = None
+            finally:
+                # Forget the records deleted before a failure too.
+                self.index.remove(zone_id, deleted)
+
+                if self.coordinator:
+                    self.coordinator.records_deleted(zone_id, deleted)
+
+    def _chunks(
+        self, items: Iterable[_T], chunk_size: int | None
+    ) -> Iterator[list[_T]]:
+        """Split items into chunks, reading them lazily.
+
+        Args:
+            items: The items to split.
+            chunk_size: The number of items per chunk, defaults to `chunk_size`.
+
+        Yields:
+            The chunks.
+
+        """
+        iterator = iter(items)
+        while chunk := list(islice(iterator, chunk_size or self.chunk_size)):
+            yield chunk
+
+    def _evict(self, previous: ChallengePlan, plan: ChallengePlan) -> None:
+        """Evict the DNS zones and record listings of a chunk no longer needed.
+
+        Args:
+            previous: The plan of the previous chunk.
+            plan: The plan of the chunk just handled, whose zones are kept.
+
+        """
+        needed = {record.zone_id for record in plan}
+        zones = {record.zone_id: record.registered_domain for record in previous}
+
+        with self._zones_lock:
+            for zone_id, domain in zones.items():
+                if zone_id in needed:
+                    continue
+
+                # Prefetches still running are kept, their result is awaited.
+                prefetched = self._zones.get(domain)
+                if prefetched and prefetched.done():
+                    del self._zones[domain]
+                self.index.evict(zone_id)
+
+    def _find_zone(self, domain: str) -> ApiResource | None:
+        """Find the DNS zone of a registered domain, using prefetched zones.
+
+        Args:
+            domain: The registered domain name.
+
+        Returns:
+            The DNS zone, if found.
 
         """
-        # Convert to registered domain.
-        domain = extract(domain_name).registered_domain
+        with self._zones_lock:
+            prefetched = self._zones.get(domain)
+
+        if prefetched:
+            try:
+                return prefetched.result()
+            except (PluginError, RequestException) as exception:
+                # Look up the zone again, reporting the error if it persists.
+                LOGGER.debug("Prefetching DNS zone %s failed: %s", domain, exception)
 
-        # Find the DNS zone.
         zone = self.client.find_dns_zone_by_name(domain)
 
-        # Get DNS records for DNS zone.
-        domain_records = self.client.get_relation(zone, "records")
-
-        # If no records are found raise exception.
-        if not domain_records:
-            msg = f"Unable to find DNS records for {zone}."
-            raise PluginError(msg)
-
-        # Get all matching records.
-        matching_records = [
-            record
-            for record in domain_records
-            if record.attribute("type") == "TXT"
-            and record.attribute("name") == self._compute_record_name(zone, record_name)
-            and record.attribute("content")
-            == self._compute_record_content(record_content)
-        ]
+        found: Future[ApiResource | None] = Future()
+        found.set_result(zone)
+        with self._zones_lock:
+            self._zones[domain] = found
+
+        return zone
+
+    def _perform_domain(
+        self, domain: str, challenges: list[Challenge]
+    ) -> ChallengePlan:
+        """Plan and create the TXT records for challenges of one registered domain.
+
+        Args:
+            domain: The registered domain.
+            challenges: The challenges of the registered domain.
+
+        Raises:
+            PluginError: If the DNS zone is not found.
+            IncompletePlanError: If a record can not be created.
+
+        Returns:
+            The plan including the ids of the created records.
+
+        """
+        return self.add_txt_records(self.plan_txt_records(challenges, domain))
+
+    def _pipeline_domain(
+        self, domain: str, challenges: list[Challenge]
+    ) -> ChallengePlan:
+        """Perform the challenges of one registered domain in a pipeline thread.
+
+        Args:
+            domain: The registered domain.
+            challenges: The challenges of the registered domain.
+
+        Returns:
+            The plan including the ids of the created records.
+
+        """
+        with self._worker():
+            return self._perform_domain(domain, challenges)
+
+    def _plan_txt_records(
+        self, domain_challenges: Iterable[tuple[str, Challenge]]
+    ) -> ChallengePlan:
+        """Compute the TXT records for challenges of known registered domains.
+
+        Args:
+            domain_challenges: The challenges with their registered domain.
+
+        Raises:
+            PluginError: If no DNS zone is found for one of the domains.
+
+        Returns:
+            The plan of TXT records to create.
+
+        """
+        records = []
+
+        for domain, challenge in domain_challenges:
+            domain_name, record_name, record_content = challenge
+
+            # Find the DNS zone, once per registered domain.
+            with self._trace(challenge, "zone_lookup"):
+                zone = self._find_zone(domain)
+            if self.tracer:
+                self.tracer.merge(domain, challenge)
+
+            # If no zone is found, raise exception.
+            if not zone:
+                msg = (
+                    f"Unable to find DNS zone for {domain_name}. "
+                    f"Zone {domain} not found."
+                )
+                raise PluginError(msg)
+
+            LOGGER.debug(
+                "Found DNS zone %s for domain %s", zone.attribute("name"), domain_name
+            )
+
+            records.append(
+                PlannedRecord(
+                    domain=domain_name,
+                    validation_name=record_name,
+                    validation=record_content,
+                    zone_id=zone.id(),
+                    zone_name=zone.attribute("name"),
+                    name=self._compute_record_name(zone, record_name),
+                    content=self._compute_record_content(record_content),
+                    registered_domain=domain,
+                )
+            )
+
+        return ChallengePlan(tuple(records))
+
+    def _prefetch(self, domains: Iterable[str]) -> None:
+        """Look up the DNS zones of registered domains in the background.
+
+        Args:
+            domains: The registered domains.
+
+        """
+        with self._zones_lock:
+            for domain in domains:
+                if domain in self._zones:
+                    continue
+
+                if not self._executor:
+                    self._executor = ThreadPoolExecutor(
+                        self.prefetch_workers, thread_name_prefix="dns-exonet-prefetch"
+                    )
+
+                LOGGER.debug("Prefetching DNS zone %s", domain)
+                self._zones[domain] = self._executor.submit(self._prefetch_zone, domain)
+
+    def _prefetch_zone(self, domain: str) -> ApiResource | None:
+        """Look up the DNS zone of a registered domain in the background.
+
+        Args:
+            domain: The registered domain name.
+
+        Returns:
+            The DNS zone, if found.
+
+        """
+        with self._worker(), self._trace(domain, "zone_lookup"):
+            return self.client.find_dns_zone_by_name(domain)
+
+    def _list_records(self, zone_id: str) -> list[DnsRecord] | None:
+        """List the DNS records of a zone, shared with coordinated processes.
+
+        Args:
+            zone_id: The id of the DNS zone.
+
+        Returns:
+            Optional[list[DnsRecord]]: The DNS records if found.
+
+        """
+        if not self.coordinator:
+            return self.client.list_dns_records(zone_id)
+
+        return self.coordinator.records(
+            zone_id, lambda: self.client.list_dns_records(zone_id)
+        )
+
+    def _zone_lock(self, zone_id: str) -> AbstractContextManager[None]:
+        """Get the lock for changing the records of a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+
+        Returns:
+            The coordinated lock, or no lock when not coordinating.
+
+        """
+        if not self.coordinator:
+            return nullcontext()
+
+        return self.coordinator.lock(zone_id)
+
+    def _worker(self) -> AbstractContextManager[None]:
+        """Get the context profiling a task run in a worker thread.
+
+        Returns:
+            The profiled context, or nothing when not profiling.
+
+        """
+        if not self.profiler:
+            return nullcontext()
+
+        return self.profiler.profile_thread()
+
+    def _trace(self, key: Hashable, phase: str) -> AbstractContextManager[None]:
+        """Get the span tracing a phase of a challenge.
+
+        Args:
+            key: The challenge, or the registered domain of a prefetched zone.
+            phase: The name of the phase.
+
+        Returns:
+            The span, or nothing when not tracing.
+
+        """
+        if not self.tracer:
+            return nullcontext()
 
-        # Delete all matching records.
-        for record in matching_records:
-            self.client.delete_api_resource(record)
+        return self.tracer.span(key, phase)
 
     @staticmethod
     def _compute_record_name(domain: ApiResource, full_record_name: str) -> str:
@@ -0,0 +1,202 @@
+"""In-memory index of the DNS records of zones changed during a run."""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from certbot_dns_exonet.clients.dns_record import DnsRecord
+
+# Record key: (type, name, content).
+RecordKey = tuple[str, str, str]
+
+# Approximate memory used by an indexed record, besides its strings.
+RECORD_OVERHEAD = 320
+
+
+class RecordIndex:
+    """In-memory index of the DNS records of zones changed during a run.
+
+    A zone is seeded with a single listing from the Exonet API and then kept up
+    to date with every record created or deleted through the service, so later
+    lookups in the same run do not list the zone again. Records created in a zone
+    that was never listed are indexed too: they can be found, but the index of
+    that zone is incomplete until it is seeded.
+
+    When `max_bytes` is set, the least recently used zones are evicted once the
+    index grows beyond it. An evicted zone is listed again when it is needed.
+    """
+
+    max_bytes: int | None
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        """Record index constructor.
+
+        Args:
+            max_bytes: The approximate memory the index may use, if bounded.
+
+        """
+        self.max_bytes = max_bytes
+        self._records: dict[str, dict[str, DnsRecord]] = {}
+        # Record ids per key, in listing order.
+        self._keys: dict[str, dict[RecordKey, dict[str, None]]] = {}
+        self._seeded: set[str] = set()
+        # Approximate memory used per zone, least recently used first.
+        self._sizes: dict[str, int] = {}
+        self._size = 0
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        """Get the approximate memory used by the index.
+
+        Returns:
+            The size in bytes.
+
+        """
+        with self._lock:
+            return self._size
+
+    def is_seeded(self, zone_id: str) -> bool:
+        """Check if the index holds the complete listing of a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+
+        Returns:
+            True if the zone has been seeded.
+
+        """
+        with self._lock:
+            return zone_id in self._seeded
+
+    def seed(self, zone_id: str, records: Iterable[DnsRecord]) -> None:
+        """Replace the indexed records of a DNS zone with a complete listing.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            records: The records listed by the Exonet API.
+
+        """
+        with self._lock:
+            self._evict(zone_id)
+            self._seeded.add(zone_id)
+            self._add(zone_id, records)
+
+    def add(self, zone_id: str, records: Iterable[DnsRecord]) -> None:
+        """Index records created in a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            records: The created records.
+
+        """
+        with self._lock:
+            self._add(zone_id, records)
+
+    def remove(self, zone_id: str, record_ids: Iterable[str]) -> None:
+        """Remove deleted records from the index of a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            record_ids: The ids of the deleted records.
+
+        """
+        with self._lock:
+            records = self._records.get(zone_id, {})
+            keys = self._keys.get(zone_id, {})
+
+            for record_id in record_ids:
+                record = records.pop(record_id, None)
+                if record is None:
+                    continue
+
+                key = (record.type, record.name, record.content)
+                del keys[key][record_id]
+                if not keys[key]:
+                    del keys[key]
+
+                size = self._record_size(record)
+                self._sizes[zone_id] -= size
+                self._size -= size
+
+    def find(
+        self, zone_id: str, keys: Iterable[RecordKey]
+    ) -> dict[RecordKey, list[str]]:
+        """Find the ids of indexed records.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            keys: The (type, name, content) of the records to find.
+
+        Returns:
+            The ids of the matching records per key, for the keys that matched.
+
+        """
+        with self._lock:
+            indexed = self._keys.get(zone_id)
+            if indexed is None:
+                return {}
+
+            self._touch(zone_id)
+
+            return {key: list(indexed[key]) for key in keys if indexed.get(key)}
+
+    def evict(self, zone_id: str) -> None:
+        """Forget the indexed records of a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+
+        """
+        with self._lock:
+            self._evict(zone_id)
+
+    def _add(self, zone_id: str, records: Iterable[DnsRecord]) -> None:
+        zone_records = self._records.setdefault(zone_id, {})
+        zone_keys = self._keys.setdefault(zone_id, {})
+        self._touch(zone_id)
+
+        for record in records:
+            if record.id in zone_records:
+                continue
+
+            zone_records[record.id] = record
+            key = (record.type, record.name, record.content)
+            zone_keys.setdefault(key, {})[record.id] = None
+
+            size = self._record_size(record)
+            self._sizes[zone_id] += size
+            self._size += size
+
+        if self.max_bytes is None:
+            return
+
+        # Evict the least recently used zones, never the zone just changed.
+        for lru_zone_id in list(self._sizes):
+            if self._size <= self.max_bytes or lru_zone_id == zone_id:
+                break
+            self._evict(lru_zone_id)
+
+    def _evict(self, zone_id: str) -> None:
+        self._records.pop(zone_id, None)
+        self._keys.pop(zone_id, None)
+        self._seeded.discard(zone_id)
+        self._size -= self._sizes.pop(zone_id, 0)
+
+    def _touch(self, zone_id: str) -> None:
+        # Move the zone to the end, as the most recently used.
+        self._sizes[zone_id] = self._sizes.pop(zone_id, 0)
+
+    @staticmethod
+    def _record_size(record: DnsRecord) -> int:
+        return (
+            RECORD_OVERHEAD
+            + len(record.id)
+            + len(record.type)
+            + len(record.name)
+            + len(record.content)
+        )
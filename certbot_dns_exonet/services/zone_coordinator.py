@@ -0,0 +1,157 @@
+"""Coordination between concurrent plugin runs working on the same DNS zones."""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import astuple
+from logging import getLogger
+from time import time
+from typing import TYPE_CHECKING
+
+from certbot_dns_exonet.clients.dns_record import DnsRecord
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from pathlib import Path
+
+LOGGER = getLogger(__name__)
+
+
+class ZoneCoordinator:
+    """Coordinates concurrent plugin runs working on the same DNS zones.
+
+    Processes using the same directory take an exclusive file lock per DNS zone
+    while they create or delete their records, and share the record listing of
+    the zone. The listing is fetched from the Exonet API by the first process that
+    needs it and then kept up to date by every process for the records it creates
+    or deletes, so concurrent processes do not each list the full zone.
+    """
+
+    directory: Path
+    max_age: float
+
+    def __init__(self, directory: Path, max_age: float = 60) -> None:
+        """Zone coordinator constructor.
+
+        Args:
+            directory: The directory shared by the coordinated processes.
+            max_age: Number of seconds a shared record listing is used.
+
+        """
+        self.directory = directory
+        self.max_age = max_age
+
+    @contextmanager
+    def lock(self, zone_id: str) -> Iterator[None]:
+        """Take the exclusive lock for a DNS zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+
+        Yields:
+            Nothing, the lock is held in the context.
+
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with (self.directory / f"{zone_id}.lock").open("a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def records(
+        self, zone_id: str, fetch: Callable[[], list[DnsRecord] | None]
+    ) -> list[DnsRecord] | None:
+        """Get the shared record listing of a DNS zone.
+
+        Must be called while holding the lock of the zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            fetch: Function to fetch the listing from the Exonet API.
+
+        Returns:
+            Optional[list[DnsRecord]]: The records of the zone, if found.
+
+        """
+        shared = self._read(zone_id)
+        if shared is not None and time() - shared[0] <= self.max_age:
+            LOGGER.debug("Using shared DNS record listing of zone %s.", zone_id)
+            return shared[1]
+
+        records = fetch()
+        if records is not None:
+            self._write(zone_id, time(), records)
+
+        return records
+
+    def records_created(self, zone_id: str, records: Iterable[DnsRecord]) -> None:
+        """Add created records to the shared record listing of a DNS zone.
+
+        Must be called while holding the lock of the zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            records: The created records.
+
+        """
+        shared = self._read(zone_id)
+        if shared is not None:
+            self._write(zone_id, shared[0], shared[1] + list(records))
+
+    def records_deleted(self, zone_id: str, record_ids: Iterable[str]) -> None:
+        """Remove deleted records from the shared record listing of a DNS zone.
+
+        Must be called while holding the lock of the zone.
+
+        Args:
+            zone_id: The id of the DNS zone.
+            record_ids: The ids of the deleted records.
+
+        """
+        shared = self._read(zone_id)
+        if shared is not None:
+            deleted = set(record_ids)
+            self._write(
+                zone_id,
+                shared[0],
+                [record for record in shared[1] if record.id not in deleted],
+            )
+
+    def _read(self, zone_id: str) -> tuple[float, list[DnsRecord]] | None:
+        try:
+            state = json.loads(
+                (self.directory / f"{zone_id}.json").read_text(encoding="utf-8")
+            )
+            return (
+                float(state["fetched_at"]),
+                [DnsRecord(*record) for record in state["records"]],
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            LOGGER.debug("Ignoring shared DNS record listing: %s", exception)
+            return None
+
+    def _write(self, zone_id: str, fetched_at: float, records: list[DnsRecord]) -> None:
+        path = self.directory / f"{zone_id}.json"
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+
+        try:
+            temporary.write_text(
+                json.dumps(
+                    {
+                        "fetched_at": fetched_at,
+                        "records": [astuple(record) for record in records],
+                    }
+                ),
+                encoding="utf-8",
+            )
+            temporary.replace(path)
+        except OSError as exception:
+            LOGGER.debug("Unable to save shared DNS record listing: %s", exception)
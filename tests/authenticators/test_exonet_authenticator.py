@@ -1,11 +1,62 @@
 """Certbot DNS Exonet tests."""
 
+from __future__ import annotations
+
+import json
 from argparse import Namespace
+from typing import TYPE_CHECKING
 from unittest.mock import Mock, patch
 
+import pytest
 from certbot.configuration import NamespaceConfig
+from certbot.errors import PluginError
+from exonetapi.structures import ApiResource
 
+from certbot_dns_exonet.arguments import positive_int
 from certbot_dns_exonet.authenticators.exonet_authenticator import ExonetAuthenticator
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
+from tests import fakes
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _config(**options: object) -> NamespaceConfig:
+    """Create the certbot config used by the tests.
+
+    Args:
+        options: Options overriding the defaults.
+
+    Returns:
+        The certbot config.
+
+    """
+    namespace = {
+        "config_dir": "/home/dev/repositories/certbot-dns-exonet",
+        "work_dir": "/home/dev/repositories/certbot-dns-exonet/test",
+        "logs_dir": "/home/dev/repositories/certbot-dns-exonet/test",
+        "http01_port": 80,
+        "https_port": 443,
+        "domains": ["exodev.nl"],
+        "test_user_credentials": [],
+        "dns_exonet_credentials": "/home/dev/repositories/certbot-dns-exonet/exonet.ini",  # noqa: E501
+        "dns_exonet_propagation_seconds": 10,
+        "dns_exonet_circuit_breaker_state": None,
+        "dns_exonet_profile": None,
+        "dns_exonet_coordination_dir": None,
+        "dns_exonet_prefetch": False,
+        "dns_exonet_trace": None,
+        "dns_exonet_dry_run": False,
+        "dns_exonet_chunk_size": 500,
+        "dns_exonet_memory_ceiling": None,
+    }
+    namespace.update(options)
+
+    return NamespaceConfig(Namespace(**namespace))
 
 
 class TestExonetAuthenticator:
@@ -21,18 +72,7 @@ class TestExonetAuthenticator:
 
         """
         # Create input variables.
-        config = NamespaceConfig(
-            Namespace(
-                config_dir="/home/dev/repositories/certbot-dns-exonet",
-                work_dir="/home/dev/repositories/certbot-dns-exonet/test",
-                logs_dir="/home/dev/repositories/certbot-dns-exonet/test",
-                http01_port=80,
-                https_port=443,
-                domains=["exodev.nl"],
-                test_user_credentials=[],
-                dns_exonet_credentials="/home/dev/repositories/certbot-dns-exonet/exonet.ini",
-            )
-        )
+        config = _config()
 
         add_mock = Mock()
 
@@ -42,7 +82,7 @@ class TestExonetAuthenticator:
 
         # Check mock calls.
         assert mock_configure_credentials.call_count == 1
-        assert add_mock.call_count == 2
+        assert add_mock.call_count == 10
 
         # Check call args.
         assert add_mock.call_args_list[0][0][0] == "propagation-seconds"
@@ -56,6 +96,32 @@ class TestExonetAuthenticator:
         assert add_mock.call_args_list[1][0][0] == "credentials"
         assert add_mock.call_args_list[1][1]["help"] == "Exonet credentials INI file."
 
+        assert add_mock.call_args_list[2][0][0] == "circuit-breaker-state"
+        assert add_mock.call_args_list[2][1]["default"] is None
+
+        assert add_mock.call_args_list[3][0][0] == "profile"
+        assert add_mock.call_args_list[3][1]["default"] is None
+
+        assert add_mock.call_args_list[4][0][0] == "coordination-dir"
+        assert add_mock.call_args_list[4][1]["default"] is None
+
+        assert add_mock.call_args_list[5][0][0] == "prefetch"
+        assert add_mock.call_args_list[5][1]["action"] == "store_true"
+
+        assert add_mock.call_args_list[6][0][0] == "trace"
+        assert add_mock.call_args_list[6][1]["default"] is None
+
+        assert add_mock.call_args_list[7][0][0] == "dry-run"
+        assert add_mock.call_args_list[7][1]["action"] == "store_true"
+
+        assert add_mock.call_args_list[8][0][0] == "chunk-size"
+        assert add_mock.call_args_list[8][1]["default"] == 500
+        assert add_mock.call_args_list[8][1]["type"] is positive_int
+
+        assert add_mock.call_args_list[9][0][0] == "memory-ceiling"
+        assert add_mock.call_args_list[9][1]["default"] is None
+        assert add_mock.call_args_list[9][1]["type"] is positive_int
+
     @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
     def test_more_info(self, mock_configure_credentials: Mock) -> None:
         """Test the more_info function.
@@ -66,18 +132,7 @@ class TestExonetAuthenticator:
 
         """
         # Create input variables.
-        config = NamespaceConfig(
-            Namespace(
-                config_dir="/home/dev/repositories/certbot-dns-exonet",
-                work_dir="/home/dev/repositories/certbot-dns-exonet/test",
-                logs_dir="/home/dev/repositories/certbot-dns-exonet/test",
-                http01_port=80,
-                https_port=443,
-                domains=["exodev.nl"],
-                test_user_credentials=[],
-                dns_exonet_credentials="/home/dev/repositories/certbot-dns-exonet/exonet.ini",
-            )
-        )
+        config = _config()
 
         # Make the call/
         authenticator = ExonetAuthenticator(config, "dns-exonet")
@@ -91,3 +146,393 @@ class TestExonetAuthenticator:
             "This plugin configures a DNS TXT record to respond to a dns-01 "
             "challenge using the Exonet API."
         )
+
+    @patch("certbot_dns_exonet.authenticators.exonet_authenticator.sleep")
+    @patch("certbot_dns_exonet.authenticators.exonet_authenticator.display_util")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.add_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_perform_and_cleanup(  # noqa: PLR0913, PLR0917
+        self,
+        mock_configure_credentials: Mock,
+        mock_plan_txt_records: Mock,
+        mock_add_txt_records: Mock,
+        mock_del_txt_records: Mock,
+        mock_display_util: Mock,
+        mock_sleep: Mock,
+    ) -> None:
+        """Test the plan computed by perform is reused by cleanup.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_plan_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records.
+            mock_add_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.add_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+            mock_display_util: Mock of
+                certbot.display.util.
+            mock_sleep: Mock of
+                time.sleep.
+
+        """
+        # Create input variables.
+        config = _config(dns_exonet_propagation_seconds=30)
+
+        planned = PlannedRecord(
+            domain="exodev.nl",
+            validation_name="_acme-challenge.exodev.nl",
+            validation="KEna0LvLAKFIcTCadLBQ",
+            zone_id="BqgWr8dr0XV7",
+            zone_name="exodev.nl",
+            name="_acme-challenge",
+            content='"KEna0LvLAKFIcTCadLBQ"',
+        )
+        mock_plan_txt_records.return_value = ChallengePlan((planned,))
+        mock_add_txt_records.return_value = ChallengePlan(
+            (planned.created("LsaWr8dr0KSa"),)
+        )
+
+        achall = Mock()
+        achall.identifier.value = "exodev.nl"
+        achall.validation_domain_name.return_value = "_acme-challenge.exodev.nl"
+        achall.validation.return_value = "KEna0LvLAKFIcTCadLBQ"
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(config, "dns-exonet")
+        responses = authenticator.perform([achall])
+        authenticator.cleanup([achall])
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_plan_txt_records.call_count == 1
+        assert mock_add_txt_records.call_count == 1
+        assert mock_del_txt_records.call_count == 1
+        assert mock_display_util.notify.call_count == 1
+
+        # Check call args.
+        assert mock_plan_txt_records.call_args[0][0] == [
+            ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ")
+        ]
+        assert mock_sleep.call_args[0][0] == 30
+        assert [
+            record.record_id for record in mock_del_txt_records.call_args[0][0]
+        ] == ["LsaWr8dr0KSa"]
+
+        # Check response.
+        assert responses == [achall.response.return_value]
+
+    @patch("certbot_dns_exonet.authenticators.exonet_authenticator.display_util")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.estimate_txt_records")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_perform_dry_run(
+        self,
+        mock_configure_credentials: Mock,
+        mock_estimate_txt_records: Mock,
+        mock_perform_txt_records: Mock,
+        mock_del_txt_records: Mock,
+        mock_display_util: Mock,
+    ) -> None:
+        """Test a dry run reports the estimate without creating records.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_estimate_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.estimate_txt_records.
+            mock_perform_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+            mock_display_util: Mock of
+                certbot.display.util.
+
+        """
+        mock_estimate_txt_records.return_value.report.return_value = "Dry run: ..."
+
+        achall = Mock()
+        achall.identifier.value = "exodev.nl"
+        achall.validation_domain_name.return_value = "_acme-challenge.exodev.nl"
+        achall.validation.return_value = "KEna0LvLAKFIcTCadLBQ"
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(
+            _config(dns_exonet_dry_run=True), "dns-exonet"
+        )
+        with pytest.raises(PluginError) as e_info:
+            authenticator.perform([achall])
+        authenticator.cleanup([achall])
+
+        # Check error message.
+        assert e_info.value.args[0] == "Dry run, no DNS records were created."
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_estimate_txt_records.call_count == 1
+        assert mock_perform_txt_records.call_count == 0
+        assert mock_del_txt_records.call_count == 0
+
+        # Check call args.
+        assert mock_estimate_txt_records.call_args[0][0] == [
+            ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ")
+        ]
+        assert mock_display_util.notify.call_args[0][0] == "Dry run: ..."
+
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_perform_incomplete(
+        self,
+        mock_configure_credentials: Mock,
+        mock_perform_txt_records: Mock,
+        mock_del_txt_records: Mock,
+    ) -> None:
+        """Test a partially performed plan is cleaned up.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_perform_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+
+        """
+        planned = PlannedRecord(
+            domain="exodev.nl",
+            validation_name="_acme-challenge.exodev.nl",
+            validation="KEna0LvLAKFIcTCadLBQ",
+            zone_id="BqgWr8dr0XV7",
+            zone_name="exodev.nl",
+            name="_acme-challenge",
+            content='"KEna0LvLAKFIcTCadLBQ"',
+            record_id="LsaWr8dr0KSa",
+        )
+        mock_perform_txt_records.side_effect = IncompletePlanError(
+            "Unable to find DNS zone for test.nl. Zone test.nl not found.",
+            ChallengePlan((planned,)),
+        )
+
+        achalls = []
+        for domain in ("exodev.nl", "test.nl"):
+            achall = Mock()
+            achall.identifier.value = domain
+            achall.validation_domain_name.return_value = f"_acme-challenge.{domain}"
+            achall.validation.return_value = "KEna0LvLAKFIcTCadLBQ"
+            achalls.append(achall)
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(_config(), "dns-exonet")
+        with pytest.raises(IncompletePlanError):
+            authenticator.perform(achalls)
+        authenticator.cleanup(achalls)
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_del_txt_records.call_count == 1
+
+        # Check call args, the created record is deleted.
+        assert list(mock_del_txt_records.call_args[0][0]) == [planned]
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_perform_incomplete_chunks(
+        self,
+        mock_configure_credentials: Mock,
+        mock_post_api_resource: Mock,
+        mock_delete_api_resource: Mock,
+        mock_find_dns_zone_by_name: Mock,
+    ) -> None:
+        """Test the records of earlier chunks are cleaned up when a chunk fails.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        mock_find_dns_zone_by_name.side_effect = fakes.find_dns_zone_by_name
+        mock_post_api_resource.side_effect = [
+            ApiResource({"type": "dns_records", "id": "LsaWr8dr0KSa"}),
+            ApiResource({"type": "dns_records", "id": "PqeWr3dr0JSb"}),
+        ]
+
+        achalls = []
+        for domain in ("a.exodev.nl", "b.exodev.nl", "missing.nl"):
+            achall = Mock()
+            achall.identifier.value = domain
+            achall.validation_domain_name.return_value = f"_acme-challenge.{domain}"
+            achall.validation.return_value = "KEna0LvLAKFIcTCadLBQ"
+            achalls.append(achall)
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(
+            _config(dns_exonet_chunk_size=2), "dns-exonet"
+        )
+        with pytest.raises(IncompletePlanError):
+            authenticator.perform(achalls)
+        authenticator.cleanup(achalls)
+
+        # Check mock calls, the records of the first chunk are deleted.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_post_api_resource.call_count == 2
+        assert [
+            call[0][0].id() for call in mock_delete_api_resource.call_args_list
+        ] == ["LsaWr8dr0KSa", "PqeWr3dr0JSb"]
+
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records_chunked")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_cleanup_writes_profile(
+        self,
+        mock_configure_credentials: Mock,
+        mock_del_txt_records_chunked: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test a profile report is written when profiling is enabled.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_del_txt_records_chunked: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records_chunked.
+            tmp_path: Temporary directory.
+
+        """
+        # Create input variables.
+        config = _config(dns_exonet_profile=str(tmp_path))
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(config, "dns-exonet")
+        authenticator._attempt_cleanup = True
+        authenticator.cleanup([])
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 1
+        assert mock_del_txt_records_chunked.call_count == 1
+
+        # Check the profiler.
+        assert authenticator.profiler is not None
+        assert authenticator.profiler.record in (
+            authenticator.dns_service.client.listeners
+        )
+        assert authenticator.dns_service.profiler is authenticator.profiler
+        assert "cleanup" in authenticator.profiler.sections
+        assert len(list(tmp_path.glob("dns-exonet-*.txt"))) == 1
+
+    @patch("certbot_dns_exonet.authenticators.exonet_authenticator.sleep")
+    @patch("certbot_dns_exonet.authenticators.exonet_authenticator.display_util")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.add_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_cleanup_writes_trace(  # noqa: PLR0913, PLR0917
+        self,
+        mock_configure_credentials: Mock,
+        mock_plan_txt_records: Mock,
+        mock_add_txt_records: Mock,
+        mock_del_txt_records: Mock,
+        mock_display_util: Mock,
+        mock_sleep: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test a trace line per challenge is written when tracing is enabled.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_plan_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records.
+            mock_add_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.add_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+            mock_display_util: Mock of
+                certbot.display.util.
+            mock_sleep: Mock of
+                time.sleep.
+            tmp_path: Temporary directory.
+
+        """
+        # Create input variables.
+        config = _config(dns_exonet_trace=str(tmp_path / "trace.jsonl"))
+
+        planned = PlannedRecord(
+            domain="exodev.nl",
+            validation_name="_acme-challenge.exodev.nl",
+            validation="KEna0LvLAKFIcTCadLBQ",
+            zone_id="BqgWr8dr0XV7",
+            zone_name="exodev.nl",
+            name="_acme-challenge",
+            content='"KEna0LvLAKFIcTCadLBQ"',
+        )
+        mock_plan_txt_records.return_value = ChallengePlan((planned,))
+        mock_add_txt_records.return_value = ChallengePlan(
+            (planned.created("LsaWr8dr0KSa"),)
+        )
+
+        achall = Mock()
+        achall.identifier.value = "exodev.nl"
+        achall.validation_domain_name.return_value = "_acme-challenge.exodev.nl"
+        achall.validation.return_value = "KEna0LvLAKFIcTCadLBQ"
+
+        # Make the calls.
+        authenticator = ExonetAuthenticator(config, "dns-exonet")
+        authenticator.perform([achall])
+        authenticator.cleanup([achall])
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_del_txt_records.call_count == 1
+        assert mock_display_util.notify.call_count == 1
+        assert mock_sleep.call_count == 1
+
+        # Check the tracer.
+        assert authenticator.tracer is not None
+        assert authenticator.tracer.record in (
+            authenticator.dns_service.client.listeners
+        )
+
+        # Check the trace.
+        lines = (tmp_path / "trace.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["record_id"] == "LsaWr8dr0KSa"
+        assert json.loads(lines[0])["propagation"] >= 0
+
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.prefetch_zones")
+    @patch("certbot.plugins.dns_common.DNSAuthenticator._configure_credentials")
+    def test_prefetch(
+        self, mock_configure_credentials: Mock, mock_prefetch_zones: Mock
+    ) -> None:
+        """Test the DNS zones are prefetched when enabled.
+
+        Args:
+            mock_configure_credentials: Mock of
+                certbot.plugins.dns_common.DNSAuthenticator._configure_credentials.
+            mock_prefetch_zones: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.prefetch_zones.
+
+        """
+        # Make the calls.
+        ExonetAuthenticator(_config(), "dns-exonet")
+        ExonetAuthenticator(_config(dns_exonet_prefetch=True), "dns-exonet")
+
+        # Check mock calls.
+        assert mock_configure_credentials.call_count == 2
+        assert mock_prefetch_zones.call_count == 1
+
+        # Check call args.
+        assert mock_prefetch_zones.call_args[0][0] == ["exodev.nl"]
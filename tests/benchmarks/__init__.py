@@ -0,0 +1,5 @@
+"""Certbot DNS Exonet benchmarks.
+
+The benchmarks are not part of the test suite, run them as a module, e.g.
+`python -m tests.benchmarks.record_parsing`.
+"""
@@ -0,0 +1,56 @@
+"""Benchmark the startup time of the stand-alone hook.
+
+Compares starting `certbot-dns-exonet-hook` with importing the certbot plugin
+and with importing certbot's entry point together with the plugin, which is the
+minimum certbot pays before it can run the plugin.
+
+Usage: python -m tests.benchmarks.hook_startup [RUNS]
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from time import perf_counter
+
+COMMANDS = {
+    "hook --help": [sys.executable, "-m", "certbot_dns_exonet.hook", "--help"],
+    "import plugin": [
+        sys.executable,
+        "-c",
+        "import certbot_dns_exonet.authenticators.exonet_authenticator",
+    ],
+    "import certbot + plugin": [
+        sys.executable,
+        "-c",
+        (
+            "import certbot._internal.main, "
+            "certbot_dns_exonet.authenticators.exonet_authenticator"
+        ),
+    ],
+}
+
+
+def _startup(command: list[str], runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run(command, check=True, capture_output=True)  # noqa: S603
+        durations.append(perf_counter() - start)
+
+    return min(durations)
+
+
+def main(runs: int) -> None:
+    """Run the benchmark.
+
+    Args:
+        runs: The number of runs per command, the fastest run is reported.
+
+    """
+    for name, command in COMMANDS.items():
+        print(f"{name:<25} {_startup(command, runs) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,103 @@
+"""Benchmark parsing DNS record listings of large zones.
+
+Compares hydrating the records through the ApiResource machinery of exonetapi
+(as `ApiResource.related(...).get()` does) with the minimal parser used by
+`ExonetClient.list_dns_records`.
+
+Usage: python -m tests.benchmarks.record_parsing [RECORDS ...]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tracemalloc
+from functools import partial
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from exonetapi.result import Parser
+
+from certbot_dns_exonet.clients.exonet_client import ExonetClient
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def synthetic_zone(records: int) -> bytes:
+    """Create the API response of a zone with the given number of records.
+
+    Args:
+        records: The number of records.
+
+    Returns:
+        The JSON:API response body.
+
+    """
+    return json.dumps(
+        {
+            "data": [
+                {
+                    "type": "dns_records",
+                    "id": f"record{i:08d}",
+                    "attributes": {
+                        "type": "TXT" if i % 4 == 0 else "A",
+                        "name": f"host{i}",
+                        "content": f'"{i:064x}"' if i % 4 == 0 else "192.0.2.1",
+                        "ttl": 3600,
+                        "priority": None,
+                        "hostname": f"host{i}.example.com",
+                    },
+                    "relationships": {
+                        "zone": {"data": {"type": "dns_zones", "id": "zone0001"}}
+                    },
+                }
+                for i in range(records)
+            ],
+            "meta": {"total": records},
+            "links": {"next": None},
+        }
+    ).encode()
+
+
+def _parse_full(content: bytes) -> object:
+    return Parser(content).parse()
+
+
+def _measure(parse: Callable[[], object]) -> tuple[float, int]:
+    seconds = min(repeat(parse, number=1, repeat=5))
+
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def main(sizes: list[int]) -> None:
+    """Run the benchmark.
+
+    Args:
+        sizes: The zone sizes (number of records) to benchmark.
+
+    """
+    print(
+        f"{'records':>8} {'exonetapi':>12} {'minimal':>12} {'speedup':>8} "
+        f"{'exonetapi peak':>15} {'minimal peak':>13}"
+    )
+    for size in sizes:
+        content = synthetic_zone(size)
+        full, full_peak = _measure(partial(_parse_full, content))
+        minimal, minimal_peak = _measure(
+            partial(ExonetClient.parse_dns_records, content)
+        )
+        print(
+            f"{size:>8} {full * 1000:>10.1f}ms {minimal * 1000:>10.1f}ms "
+            f"{full / minimal:>7.1f}x {full_peak / 1024:>12.0f}KiB "
+            f"{minimal_peak / 1024:>10.0f}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [1000, 5000, 20000])
@@ -1,7 +1,11 @@
 """Certbot DNS Exonet."""
 
+from .test_circuit_breaker import TestCircuitBreaker
 from .test_exonet_client import TestExonetClient
+from .test_response_cache import TestResponseCache
 
 __all__ = [
+    "TestCircuitBreaker",
     "TestExonetClient",
+    "TestResponseCache",
 ]
@@ -0,0 +1,172 @@
+"""Certbot DNS Exonet tests."""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from certbot.errors import PluginError
+from exonetapi.auth.Authenticator import Authenticator
+from exonetapi.structures import ApiResource
+from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError
+
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.clients.exonet_client import ExonetClient
+
+
+def _http_error(status_code: int) -> HTTPError:
+    response = Mock(spec=Response)
+    response.text = "This is broken"
+    response.status_code = status_code
+
+    return HTTPError(response=response)
+
+
+def _fail(circuit_breaker: CircuitBreaker, exception: Exception) -> None:
+    with pytest.raises(type(exception)), circuit_breaker:
+        raise exception
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker."""
+
+    def test_opens_after_failures(self) -> None:
+        """Test the breaker opens after consecutive failures."""
+        circuit_breaker = CircuitBreaker(failure_threshold=3)
+
+        for _ in range(3):
+            _fail(circuit_breaker, _http_error(503))
+
+        with pytest.raises(PluginError) as e_info, circuit_breaker:
+            pytest.fail("The call should not be made.")
+
+        # Check error message.
+        assert e_info.value.args[0].startswith(
+            "The Exonet API is unavailable after 3 consecutive failures"
+        )
+
+    def test_success_resets_failures(self) -> None:
+        """Test a successful call resets the consecutive failures."""
+        circuit_breaker = CircuitBreaker(failure_threshold=3)
+
+        _fail(circuit_breaker, RequestsConnectionError())
+        _fail(circuit_breaker, _http_error(429))
+        with circuit_breaker:
+            pass
+        _fail(circuit_breaker, _http_error(500))
+
+        # Check state.
+        assert circuit_breaker.failures == 1
+        assert circuit_breaker.opened_at is None
+
+    def test_client_errors_are_ignored(self) -> None:
+        """Test client errors do not open the breaker."""
+        circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+        _fail(circuit_breaker, _http_error(404))
+        _fail(circuit_breaker, PluginError("Not an API failure"))
+
+        # Check state.
+        assert circuit_breaker.failures == 0
+        assert circuit_breaker.opened_at is None
+
+    @patch("certbot_dns_exonet.clients.circuit_breaker.time")
+    def test_trial_call_after_reset_timeout(self, mock_time: Mock) -> None:
+        """Test a trial call is made after the reset timeout.
+
+        Args:
+            mock_time: Mock of time.time.
+
+        """
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+        mock_time.return_value = 1000
+        _fail(circuit_breaker, _http_error(502))
+
+        mock_time.return_value = 1061
+        with circuit_breaker:
+            pass
+
+        # Check state.
+        assert circuit_breaker.failures == 0
+        assert circuit_breaker.opened_at is None
+
+    @patch("certbot_dns_exonet.clients.circuit_breaker.time")
+    def test_trial_call_client_error(self, mock_time: Mock) -> None:
+        """Test a trial call answered with a client error closes the breaker.
+
+        Args:
+            mock_time: Mock of time.time.
+
+        """
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+        mock_time.return_value = 1000
+        _fail(circuit_breaker, RequestsConnectionError())
+
+        mock_time.return_value = 1061
+        _fail(circuit_breaker, _http_error(404))
+
+        # Check state.
+        assert circuit_breaker.failures == 0
+        assert circuit_breaker.opened_at is None
+
+        # The next call is made.
+        with circuit_breaker:
+            pass
+
+    def test_state_file(self, tmp_path: Path) -> None:
+        """Test the state is shared using the state file.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        state_file = tmp_path / "circuit-breaker.json"
+
+        _fail(
+            CircuitBreaker(failure_threshold=1, state_file=state_file),
+            _http_error(503),
+        )
+
+        with (
+            pytest.raises(PluginError),
+            CircuitBreaker(failure_threshold=1, state_file=state_file),
+        ):
+            pytest.fail("The call should not be made.")
+
+    def test_shared(self, tmp_path: Path) -> None:
+        """Test the breaker is shared per state file.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        assert CircuitBreaker.shared() is CircuitBreaker.shared()
+        assert CircuitBreaker.shared(tmp_path) is not CircuitBreaker.shared()
+
+    @patch.object(Authenticator, "set_token")
+    @patch.object(ApiResource, "post")
+    def test_client_fails_fast(self, mock_post: Mock, mock_set_token: Mock) -> None:
+        """Test the Exonet client fails fast while the API is unavailable.
+
+        Args:
+            mock_post: Mock of
+                exonetapi.structures.ApiResource.post.
+            mock_set_token: Mock of
+                exonetapi.auth.Authenticator.set_token.
+
+        """
+        mock_post.side_effect = _http_error(503)
+
+        exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        resource = ApiResource({"type": "dns_records", "id": "qjJWA0Km8xgw"})
+
+        for _ in range(6):
+            with pytest.raises(PluginError):
+                exonet_client.post_api_resource(resource)
+
+        # Check mock calls, the last call is not made.
+        assert mock_post.call_count == 5
+        assert mock_set_token.call_count == 1
@@ -1,18 +1,62 @@
 """Certbot DNS Exonet tests."""
 
+from __future__ import annotations
+
+import json
 from unittest.mock import Mock, patch
 
 import pytest
 from certbot.errors import PluginError
 from exonetapi.auth.Authenticator import Authenticator
-from exonetapi.RequestBuilder import RequestBuilder
-from exonetapi.structures import ApiResource, ApiResourceSet
-from requests import Response
+from exonetapi.structures import ApiResource
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
+from certbot_dns_exonet.clients.dns_record import DnsRecord
 from certbot_dns_exonet.clients.exonet_client import ExonetClient
 
 
+def _zones_response(headers: dict[str, str] | None = None) -> Mock:
+    response = Mock(spec=Response)
+    response.status_code = 200
+    response.headers = headers or {}
+    response.content = json.dumps(
+        {
+            "data": [
+                {
+                    "type": "dns_zones",
+                    "id": "BqgWr8dr0XV7",
+                    "attributes": {"name": "test.nl"},
+                }
+            ]
+        }
+    ).encode()
+
+    return response
+
+
+def _records_response(records: list[tuple[str, str]], next_link: str | None) -> Mock:
+    response = Mock(spec=Response)
+    response.status_code = 200
+    response.headers = {}
+    response.content = json.dumps(
+        {
+            "data": [
+                {
+                    "type": "dns_records",
+                    "id": record_id,
+                    "attributes": {"type": "TXT", "name": name, "content": '"x"'},
+                }
+                for record_id, name in records
+            ],
+            "links": {"next": next_link},
+        }
+    ).encode()
+
+    return response
+
+
 class TestExonetClient:
     """The Exonet test Client."""
 
@@ -31,6 +75,24 @@ class TestExonetClient:
         assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
         assert mock_set_token.call_count == 1
 
+    @pytest.mark.parametrize(("pool_size", "maxsize"), [(None, 10), (40, 40)])
+    def test_pool_size(self, pool_size: int | None, maxsize: int) -> None:
+        """Test the number of connections per host kept open by the session.
+
+        Args:
+            pool_size: The pool size passed to the client.
+            maxsize: The expected pool size.
+
+        """
+        exonet_client = ExonetClient(
+            "kaSD0ffAD1ldSA92A0KODkaksda02KDAK", pool_size=pool_size
+        )
+        adapter = exonet_client.session.get_adapter("https://api.exonet.nl")
+
+        # Check the pool size.
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == maxsize
+
     @patch.object(Authenticator, "set_token")
     @patch.object(ApiResource, "post")
     def test_post_api_resource(self, mock_post: Mock, mock_set_token: Mock) -> None:
@@ -153,21 +215,21 @@ class TestExonetClient:
         assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
 
     @patch.object(Authenticator, "set_token")
-    @patch.object(RequestBuilder, "get")
-    def test_get_relation(self, mock_get: Mock, mock_set_token: Mock) -> None:
-        """Test get_relation method from Exonet client.
+    @patch.object(Session, "get")
+    def test_find_dns_zone_by_name(self, mock_get: Mock, mock_set_token: Mock) -> None:
+        """Test the find_dns_zone_by_name function from the Exonet client.
 
         Args:
             mock_get: Mock of
-                exonetapi.RequestBuilder.get.
+                requests.Session.get.
             mock_set_token: Mock of
                 exonetapi.auth.Authenticator.set_token.
 
         """
+        mock_get.return_value = _zones_response()
+
         exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
-        exonet_client.get_relation(
-            ApiResource({"type": "dns_records", "id": "qjJWA0Km8xgw"}), "records"
-        )
+        zone = exonet_client.find_dns_zone_by_name("test.nl")
 
         # Check mock calls.
         assert mock_set_token.call_count == 1
@@ -175,30 +237,92 @@ class TestExonetClient:
 
         # Check call args.
         assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
+        assert mock_get.call_args[0][0] == "https://api.exonet.nl/dns_zones"
+        assert mock_get.call_args[1]["params"] == {"filter[name]": "test.nl"}
+
+        # Check response data.
+        assert isinstance(zone, ApiResource)
+        assert zone.id() == "BqgWr8dr0XV7"
+        assert zone.attribute("name") == "test.nl"
+
+    @patch.object(Authenticator, "set_token")
+    @patch.object(Session, "get")
+    def test_find_dns_zone_by_name_not_modified(
+        self, mock_get: Mock, mock_set_token: Mock
+    ) -> None:
+        """Test the find_dns_zone_by_name function uses conditional requests.
+
+        Args:
+            mock_get: Mock of
+                requests.Session.get.
+            mock_set_token: Mock of
+                exonetapi.auth.Authenticator.set_token.
+
+        """
+        not_modified = Mock(spec=Response)
+        not_modified.status_code = 304
+
+        mock_get.side_effect = [
+            _zones_response({"ETag": '"zones-v1"', "Last-Modified": "yesterday"}),
+            not_modified,
+        ]
+
+        exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        exonet_client.find_dns_zone_by_name("test.nl")
+        zone = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK").find_dns_zone_by_name(
+            "test.nl"
+        )
+
+        # Check mock calls.
+        assert mock_set_token.call_count == 2
+        assert mock_get.call_count == 2
+
+        # Check call args.
+        assert "If-None-Match" not in mock_get.call_args_list[0][1]["headers"]
+        assert mock_get.call_args_list[1][1]["headers"]["If-None-Match"] == (
+            '"zones-v1"'
+        )
+        assert mock_get.call_args_list[1][1]["headers"]["If-Modified-Since"] == (
+            "yesterday"
+        )
+        assert not_modified.raise_for_status.call_count == 0
+
+        # Check response data, taken from the cache.
+        assert isinstance(zone, ApiResource)
+        assert zone.id() == "BqgWr8dr0XV7"
 
     @patch.object(Authenticator, "set_token")
-    @patch.object(RequestBuilder, "get")
-    def test_get_relation_http_error(
+    @patch.object(Session, "get")
+    def test_find_dns_zone_by_name_http_error(
         self, mock_get: Mock, mock_set_token: Mock
     ) -> None:
-        """Test get_relation method from Exonet client when HTTPError occurs.
+        """Test the find_dns_zone_by_name from the Exonet client when HTTPError occurs.
 
         Args:
             mock_get: Mock of
-                exonetapi.RequestBuilder.get.
+                requests.Session.get.
             mock_set_token: Mock of
                 exonetapi.auth.Authenticator.set_token.
 
         """
         response = Mock(spec=Response)
         response.text = "This is broken"
+        response.status_code = 401
         error = HTTPError(response=response)
 
-        mock_get.side_effect = error
+        response.raise_for_status.side_effect = error
+
+        mock_get.return_value = response
 
         exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
-        call_response = exonet_client.get_relation(
-            ApiResource({"type": "dns_records", "id": "qjJWA0Km8xgw"}), "records"
+
+        with pytest.raises(PluginError) as e_info:
+            exonet_client.find_dns_zone_by_name("test.nl")
+
+        # Check error message.
+        assert e_info.value.args[0] == (
+            "Error finding DNS zone using the Exonet API:"
+            " (Did you provide a valid API token?)"
         )
 
         # Check mock calls.
@@ -208,83 +332,116 @@ class TestExonetClient:
         # Check call args.
         assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
 
-        # Check response.
-        assert call_response is None
-
     @patch.object(Authenticator, "set_token")
-    @patch.object(RequestBuilder, "get")
-    def test_find_dns_zone_by_name(self, mock_get: Mock, mock_set_token: Mock) -> None:
-        """Test the find_dns_zone_by_name function from the Exonet client.
+    @patch.object(ApiResource, "delete")
+    def test_listeners(self, mock_delete: Mock, mock_set_token: Mock) -> None:
+        """Test the listeners are notified of API calls.
 
         Args:
-            mock_get: Mock of
-                exonetapi.RequestBuilder.get.
+            mock_delete: Mock of
+                exonetapi.structures.ApiResource.delete.
             mock_set_token: Mock of
                 exonetapi.auth.Authenticator.set_token.
 
         """
-        api_resource_set = ApiResourceSet()
-        api_resource_set.add_resource(
-            ApiResource({"type": "dns_zones", "id": "BqgWr8dr0XV7", "name": "test.nl"})
+        listener = Mock()
+
+        exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        exonet_client.listeners.append(listener)
+        exonet_client.delete_api_resource(
+            ApiResource({"type": "dns_records", "id": "qjJWA0Km8xgw"})
         )
 
-        mock_get.return_value = api_resource_set
+        # Check mock calls.
+        assert mock_delete.call_count == 1
+        assert mock_set_token.call_count == 1
+        assert listener.call_count == 1
+
+        # Check call args.
+        assert listener.call_args[0][0] == "delete_api_resource"
+        assert listener.call_args[0][1] >= 0
+
+    @patch.object(Authenticator, "set_token")
+    @patch.object(Session, "get")
+    def test_list_dns_records(self, mock_get: Mock, mock_set_token: Mock) -> None:
+        """Test listing DNS records over multiple pages.
+
+        Args:
+            mock_get: Mock of
+                requests.Session.get.
+            mock_set_token: Mock of
+                exonetapi.auth.Authenticator.set_token.
+
+        """
+        mock_get.side_effect = [
+            _records_response(
+                [("LsaWr8dr0KSa", "_acme-challenge")],
+                "https://api.exonet.nl/dns_zones/BqgWr8dr0XV7/records?page[number]=2",
+            ),
+            _records_response([("PqeWr3dr0JSb", "www")], None),
+        ]
 
         exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
-        zone = exonet_client.find_dns_zone_by_name("test.nl")
+        records = exonet_client.list_dns_records("BqgWr8dr0XV7")
 
         # Check mock calls.
         assert mock_set_token.call_count == 1
-        assert mock_get.call_count == 1
+        assert mock_get.call_count == 2
 
         # Check call args.
-        assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
+        assert mock_get.call_args_list[0][0][0] == (
+            "https://api.exonet.nl/dns_zones/BqgWr8dr0XV7/records"
+        )
+        assert mock_get.call_args_list[0][1]["params"] == {
+            "fields[dns_records]": "type,name,content",
+            "page[size]": 500,
+        }
+        assert mock_get.call_args_list[1][0][0].endswith("?page[number]=2")
+        assert mock_get.call_args_list[1][1]["params"] is None
 
         # Check response data.
-        assert isinstance(zone, ApiResource)
+        assert records == [
+            DnsRecord("LsaWr8dr0KSa", "TXT", "_acme-challenge", '"x"'),
+            DnsRecord("PqeWr3dr0JSb", "TXT", "www", '"x"'),
+        ]
 
     @patch.object(Authenticator, "set_token")
-    @patch.object(RequestBuilder, "get")
-    def test_find_dns_zone_by_name_http_error(
+    @patch.object(Session, "get")
+    def test_list_dns_records_http_error(
         self, mock_get: Mock, mock_set_token: Mock
     ) -> None:
-        """Test the find_dns_zone_by_name from the Exonet client when HTTPError occurs.
+        """Test listing DNS records when HTTPError occurs.
 
         Args:
             mock_get: Mock of
-                exonetapi.RequestBuilder.get.
+                requests.Session.get.
             mock_set_token: Mock of
                 exonetapi.auth.Authenticator.set_token.
 
         """
         response = Mock(spec=Response)
         response.text = "This is broken"
-        response.status_code = 401
-        error = HTTPError(response=response)
+        response.status_code = 404
+        response.raise_for_status.side_effect = HTTPError(response=response)
 
-        mock_get.side_effect = error
-
-        api_resource_set = ApiResourceSet()
-        api_resource_set.add_resource(
-            ApiResource({"type": "dns_zones", "id": "BqgWr8dr0XV7", "name": "test.nl"})
-        )
-
-        mock_get.return_value = api_resource_set
+        mock_get.return_value = response
 
         exonet_client = ExonetClient("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
-
-        with pytest.raises(PluginError) as e_info:
-            exonet_client.find_dns_zone_by_name("test.nl")
-
-        # Check error message.
-        assert e_info.value.args[0] == (
-            "Error finding DNS zone using the Exonet API:"
-            " (Did you provide a valid API token?)"
-        )
+        records = exonet_client.list_dns_records("BqgWr8dr0XV7")
 
         # Check mock calls.
         assert mock_set_token.call_count == 1
         assert mock_get.call_count == 1
 
-        # Check call args.
-        assert mock_set_token.call_args[0][0] == "kaSD0ffAD1ldSA92A0KODkaksda02KDAK"
+        # Check response.
+        assert records is None
+
+    def test_parse_dns_records(self) -> None:
+        """Test parsing a DNS record listing without optional members."""
+        records, next_link = ExonetClient.parse_dns_records(
+            b'{"data": [{"type": "dns_records", "id": "LsaWr8dr0KSa"}]}'
+        )
+
+        # Check response data.
+        assert records == [DnsRecord("LsaWr8dr0KSa", "", "", "")]
+        assert next_link is None
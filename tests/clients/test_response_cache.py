@@ -0,0 +1,101 @@
+"""Certbot DNS Exonet tests."""
+
+from unittest.mock import Mock
+
+from requests import Response
+
+from certbot_dns_exonet.clients.response_cache import CachedResponse, ResponseCache
+
+
+def _response(headers: dict[str, str], content: bytes = b'{"data": []}') -> Mock:
+    response = Mock(spec=Response)
+    response.headers = headers
+    response.content = content
+
+    return response
+
+
+class TestResponseCache:
+    """Test the response cache."""
+
+    def test_key(self) -> None:
+        """Test the cache key does not depend on the parameter order."""
+        assert ResponseCache.key(
+            "token", "https://api.exonet.nl/dns_zones", {"b": 2, "a": "1"}
+        ) == ResponseCache.key(
+            "token", "https://api.exonet.nl/dns_zones", {"a": 1, "b": "2"}
+        )
+        assert ResponseCache.key(
+            "token", "https://api.exonet.nl/dns_zones", None
+        ) != ResponseCache.key("other", "https://api.exonet.nl/dns_zones", None)
+
+    def test_store(self) -> None:
+        """Test only responses with a validator are cached."""
+        cache = ResponseCache()
+        key = ResponseCache.key("token", "https://api.exonet.nl/dns_zones", None)
+
+        cache.store(key, _response({"ETag": '"v1"'}))
+
+        # Check the cached response.
+        assert cache.get(key) == CachedResponse('"v1"', None, b'{"data": []}')
+
+        # A response without validators replaces the cached response.
+        cache.store(key, _response({}))
+
+        assert cache.get(key) is None
+
+    def test_max_bytes(self) -> None:
+        """Test the least recently used responses are evicted beyond the budget."""
+        cache = ResponseCache(max_bytes=25)
+        keys = [
+            ResponseCache.key("token", f"https://api.exonet.nl/dns_zones/{i}", None)
+            for i in range(3)
+        ]
+
+        cache.store(keys[0], _response({"ETag": '"v1"'}, b"0" * 10))
+        cache.store(keys[1], _response({"ETag": '"v1"'}, b"1" * 10))
+        # Use the first response, so the second is the least recently used.
+        assert cache.get(keys[0])
+        cache.store(keys[2], _response({"ETag": '"v1"'}, b"2" * 10))
+
+        # Check the cached responses.
+        assert cache.size == 20
+        assert cache.get(keys[0])
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2])
+
+        # A response larger than the budget is still kept on its own.
+        cache.store(keys[1], _response({"ETag": '"v1"'}, b"1" * 30))
+
+        assert cache.size == 30
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[1])
+
+        cache.store(keys[0], _response({"ETag": '"v1"'}, b"0" * 10))
+        cache.limit(15)
+
+        # Check the least recently used responses are evicted.
+        assert cache.max_bytes == 15
+        assert cache.size == 10
+        assert cache.get(keys[1]) is None
+
+        # A higher limit does not raise the budget.
+        cache.limit(100)
+
+        assert cache.max_bytes == 15
+
+        cache.clear()
+
+        assert cache.size == 0
+
+    def test_conditional_headers(self) -> None:
+        """Test the conditional request headers."""
+        assert CachedResponse('"v1"', "yesterday", b"").conditional_headers() == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "yesterday",
+        }
+        assert CachedResponse(None, None, b"").conditional_headers() == {}
+
+    def test_shared(self) -> None:
+        """Test the cache is shared."""
+        assert ResponseCache.shared() is ResponseCache.shared()
@@ -0,0 +1,21 @@
+"""Certbot DNS Exonet test fixtures."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.clients.response_cache import ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state() -> Iterator[None]:
+    """Do not share circuit breaker and response cache state between tests.
+
+    Yields:
+        Nothing, the shared state is reset after the test.
+
+    """
+    yield
+    CircuitBreaker._shared.clear()
+    ResponseCache._shared = None
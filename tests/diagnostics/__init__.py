@@ -0,0 +1,9 @@
+"""Certbot DNS Exonet."""
+
+from .test_profiler import TestProfiler
+from .test_tracer import TestChallengeTracer
+
+__all__ = [
+    "TestChallengeTracer",
+    "TestProfiler",
+]
@@ -0,0 +1,116 @@
+"""Certbot DNS Exonet tests."""
+
+import tracemalloc
+from pathlib import Path
+from threading import Barrier, Thread
+
+from certbot_dns_exonet.diagnostics.profiler import Profiler
+
+
+def _worker_task() -> None:
+    sorted(str(i) for i in range(1000))
+
+
+class TestProfiler:
+    """Test the profiler."""
+
+    def test_write_report(self, tmp_path: Path) -> None:
+        """Test writing the report of a profiled run.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        profiler = Profiler(tmp_path / "profiles")
+
+        with profiler.profile("perform"), profiler.profile("nested"):
+            sorted(str(i) for i in range(1000))
+        with profiler.profile("cleanup"):
+            pass
+        profiler.record("find_dns_zone_by_name", 0.25)
+        profiler.record("find_dns_zone_by_name", 0.5)
+
+        path = profiler.write_report()
+        report = path.read_text(encoding="utf-8")
+
+        # Check the written files.
+        assert path.parent == tmp_path / "profiles"
+        assert path.with_suffix(".prof").exists()
+
+        # Check the report.
+        assert "perform" in report
+        assert "nested" in report
+        assert "cleanup" in report
+        assert "find_dns_zone_by_name               2     0.7500s     0.5000s" in report
+        assert "Memory (tracemalloc):" in report
+
+        # Check tracemalloc is stopped again.
+        assert not tracemalloc.is_tracing()
+
+    def test_profile_thread(self, tmp_path: Path) -> None:
+        """Test tasks in worker threads are part of the CPU statistics.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        profiler = Profiler(tmp_path)
+
+        def task() -> None:
+            with profiler.profile_thread():
+                _worker_task()
+
+        with profiler.profile("perform"):
+            thread = Thread(target=task)
+            thread.start()
+            thread.join()
+
+        report = profiler.write_report().read_text(encoding="utf-8")
+
+        # Check the report.
+        assert "_worker_task" in report
+
+    def test_profile_concurrent_threads(self, tmp_path: Path) -> None:
+        """Test tasks in concurrent worker threads are profiled without errors.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        profiler = Profiler(tmp_path)
+        barrier = Barrier(4)
+        errors: list[Exception] = []
+
+        def task() -> None:
+            try:
+                with profiler.profile_thread():
+                    barrier.wait()
+                    _worker_task()
+            except Exception as exception:  # noqa: BLE001
+                errors.append(exception)
+
+        with profiler.profile("perform"):
+            threads = [Thread(target=task) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        report = profiler.write_report().read_text(encoding="utf-8")
+
+        # Check the tasks are profiled.
+        assert errors == []
+        assert "_worker_task" in report
+
+    def test_write_report_without_sections(self, tmp_path: Path) -> None:
+        """Test writing the report when nothing is profiled.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        path = Profiler(tmp_path).write_report()
+
+        # Check the written files.
+        assert path.exists()
+        assert not path.with_suffix(".prof").exists()
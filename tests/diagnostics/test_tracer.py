@@ -0,0 +1,100 @@
+"""Certbot DNS Exonet tests."""
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from certbot_dns_exonet.diagnostics.tracer import ChallengeTracer
+from certbot_dns_exonet.services.challenge_plan import ChallengePlan, PlannedRecord
+
+PLANNED = PlannedRecord(
+    domain="exodev.nl",
+    validation_name="_acme-challenge.exodev.nl",
+    validation="KEna0LvLAKFIcTCadLBQ",
+    zone_id="BqgWr8dr0XV7",
+    zone_name="exodev.nl",
+    name="_acme-challenge",
+    content='"KEna0LvLAKFIcTCadLBQ"',
+    record_id="LsaWr8dr0KSa",
+)
+
+
+class TestChallengeTracer:
+    """Test the challenge tracer."""
+
+    @patch("certbot_dns_exonet.diagnostics.tracer.perf_counter")
+    def test_write(self, mock_perf_counter: Mock, tmp_path: Path) -> None:
+        """Test writing the traces of a plan as JSON lines.
+
+        Args:
+            mock_perf_counter: Mock of
+                time.perf_counter.
+            tmp_path: Temporary directory.
+
+        """
+        mock_perf_counter.side_effect = [0.0, 0.5, 1.0, 1.25, 2.0, 2.5]
+        other = replace(PLANNED, domain="www.exodev.nl", record_id="PqeWr3dr0JSb")
+
+        tracer = ChallengeTracer(tmp_path / "traces" / "trace.jsonl")
+
+        # A zone prefetched in the background.
+        with tracer.span("exodev.nl", "zone_lookup"):
+            tracer.record("find_dns_zone_by_name", 0.4)
+        tracer.merge("exodev.nl", PLANNED.challenge)
+
+        with tracer.span(PLANNED.challenge, "create"):
+            tracer.record("post_api_resource", 0.2)
+        tracer.add([PLANNED.challenge, other.challenge], "propagation", 10)
+        with tracer.span(PLANNED.challenge, "delete"):
+            tracer.record("list_dns_records", 0.1)
+            tracer.record("delete_api_resource", 0.3)
+
+        # Calls outside of a span are not attributed.
+        tracer.record("find_dns_zone_by_name", 0.1)
+
+        tracer.write(ChallengePlan((PLANNED, other)))
+        tracer.write(ChallengePlan((PLANNED,)))
+
+        lines = [
+            json.loads(line)
+            for line in tracer.path.read_text(encoding="utf-8").splitlines()
+        ]
+
+        # Check the traces.
+        assert len(lines) == 3
+        assert lines[0]["domain"] == "exodev.nl"
+        assert lines[0]["zone"] == "exodev.nl"
+        assert lines[0]["record_id"] == "LsaWr8dr0KSa"
+        assert lines[0]["zone_lookup"] == 0
+        assert lines[0]["create"] == 0.25
+        assert lines[0]["propagation"] == 10
+        assert lines[0]["delete"] == 0.5
+        assert lines[0]["api_calls"] == 4
+        assert lines[0]["api_time"] == 1.0
+        assert lines[0]["api_calls_by_name"] == {
+            "find_dns_zone_by_name": 1,
+            "post_api_resource": 1,
+            "list_dns_records": 1,
+            "delete_api_resource": 1,
+        }
+        assert lines[1]["domain"] == "www.exodev.nl"
+        assert lines[1]["propagation"] == 10
+        assert lines[1]["api_calls"] == 0
+
+        # Check written traces are not written again.
+        assert lines[2]["propagation"] == 0
+        assert lines[2]["api_calls"] == 0
+
+    def test_write_error(self, tmp_path: Path) -> None:
+        """Test failing to write the trace does not fail the run.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        tracer = ChallengeTracer(tmp_path)
+        tracer.write(ChallengePlan((PLANNED,)))
+
+        # Check nothing is written.
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,43 @@
+"""Fakes of the Exonet client calls, used as side effects of their mocks."""
+
+from __future__ import annotations
+
+from exonetapi.structures import ApiResource
+
+# Domain of which no DNS zone is found.
+MISSING_DOMAIN = "missing.nl"
+
+
+def find_dns_zone_by_name(domain: str) -> ApiResource | None:
+    """Fake finding the DNS zone of a domain.
+
+    Args:
+        domain: The domain name.
+
+    Returns:
+        The DNS zone, with the upper-cased domain name as its id, or None for
+        `MISSING_DOMAIN`.
+
+    """
+    if domain == MISSING_DOMAIN:
+        return None
+
+    zone = ApiResource({"type": "dns_zones", "id": domain.upper()})
+    zone.attribute("name", domain)
+
+    return zone
+
+
+def post_api_resource(record: ApiResource) -> ApiResource:
+    """Fake creating a DNS record.
+
+    Args:
+        record: The DNS record to create.
+
+    Returns:
+        The created DNS record, with its content suffixed by "-id" as its id.
+
+    """
+    return ApiResource(
+        {"type": "dns_records", "id": f"{record.attribute('content')}-id"}
+    )
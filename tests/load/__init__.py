@@ -0,0 +1,7 @@
+"""Certbot DNS Exonet."""
+
+from .test_soak import TestSoak
+
+__all__ = [
+    "TestSoak",
+]
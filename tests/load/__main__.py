@@ -0,0 +1,5 @@
+"""Run the load and soak test of DnsService against the fake Exonet API."""
+
+from tests.load.soak import main
+
+main()
@@ -0,0 +1,283 @@
+"""Local stand-in for the Exonet API with injectable latency and failures."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from threading import Lock, Thread
+from time import sleep
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass
+class Faults:
+    """Faults injected into the responses of the fake API."""
+
+    # Latency added to every request, in seconds.
+    latency: float = 0.0
+    # Maximum random latency added on top of the fixed latency, in seconds.
+    jitter: float = 0.0
+    # Probability of answering with 429 Too Many Requests.
+    rate_limited: float = 0.0
+    # Probability of answering with 503 Service Unavailable.
+    server_error: float = 0.0
+    # Seed of the random generator deciding on jitter and failures.
+    seed: int = 0
+
+
+@dataclass
+class Store:
+    """The zones and records known to the fake API."""
+
+    zones: dict[str, str] = field(default_factory=dict)
+    records: dict[str, dict[str, dict[str, Any]]] = field(default_factory=dict)
+    lock: Lock = field(default_factory=Lock)
+    ids: count[int] = field(default_factory=count)
+
+    def zone_id(self, name: str) -> str:
+        """Get the id of a zone, creating the zone when it does not exist.
+
+        Args:
+            name: The zone name.
+
+        Returns:
+            The zone id.
+
+        """
+        with self.lock:
+            if name not in self.zones:
+                zone_id = f"zone{next(self.ids):08d}"
+                self.zones[name] = zone_id
+                self.records[zone_id] = {}
+
+            return self.zones[name]
+
+
+class FakeExonetApi:
+    """Local stand-in for the parts of the Exonet API used by the plugin.
+
+    Zones are created on the fly when they are looked up. Listings carry an
+    ETag and support conditional requests and pagination.
+    """
+
+    def __init__(self, faults: Faults | None = None, page_size: int = 100) -> None:
+        """Fake API constructor.
+
+        Args:
+            faults: The faults to inject.
+            page_size: The maximum page size of listings.
+
+        """
+        self.faults = faults or Faults()
+        self.page_size = page_size
+        self.store = Store()
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self._random = random.Random(self.faults.seed)  # noqa: S311
+        self._random_lock = Lock()
+        self._stats_lock = Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the fake API.
+
+        Returns:
+            The base URL.
+
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> FakeExonetApi:  # noqa: PYI034
+        """Start serving.
+
+        Returns:
+            The fake API.
+
+        """
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record_count(self) -> int:
+        """Get the number of records in all zones.
+
+        Returns:
+            The number of records.
+
+        """
+        with self.store.lock:
+            return sum(len(records) for records in self.store.records.values())
+
+    def _fault(self) -> tuple[float, int | None]:
+        with self._random_lock:
+            delay = self.faults.latency + self._random.uniform(0, self.faults.jitter)
+            draw = self._random.random()
+
+        if draw < self.faults.rate_limited:
+            return delay, 429
+        if draw < self.faults.rate_limited + self.faults.server_error:
+            return delay, 503
+        return delay, None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_: object) -> None:
+                """Do not log requests."""
+
+            def do_GET(self) -> None:
+                """Handle zone lookups and record listings."""
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                parts = url.path.strip("/").split("/")
+
+                if parts == ["dns_zones"]:
+                    name = query.get("filter[name]", "")
+                    body = {
+                        "data": [
+                            {
+                                "type": "dns_zones",
+                                "id": api.store.zone_id(name),
+                                "attributes": {"name": name},
+                            }
+                        ]
+                    }
+                    self._respond_listing("find_zone", body)
+                elif len(parts) == 3 and parts[0] == "dns_zones":
+                    self._respond_listing(
+                        "list_records", self._records(parts[1], query)
+                    )
+                else:
+                    self._respond("unknown", 404)
+
+            def do_POST(self) -> None:
+                """Handle creating records."""
+                length = int(self.headers.get("Content-Length", 0))
+                data = json.loads(self.rfile.read(length))["data"]
+                zone_id = data["relationships"]["zone"]["data"]["id"]
+
+                if not self._inject("create_record"):
+                    return
+
+                with api.store.lock:
+                    record_id = f"record{next(api.store.ids):08d}"
+                    api.store.records[zone_id][record_id] = data["attributes"]
+
+                self._respond(
+                    "create_record",
+                    201,
+                    {
+                        "data": {
+                            "type": "dns_records",
+                            "id": record_id,
+                            "attributes": data["attributes"],
+                        }
+                    },
+                )
+
+            def do_DELETE(self) -> None:
+                """Handle deleting records."""
+                record_id = urlparse(self.path).path.rsplit("/", 1)[-1]
+
+                if not self._inject("delete_record"):
+                    return
+
+                with api.store.lock:
+                    for records in api.store.records.values():
+                        if records.pop(record_id, None) is not None:
+                            self._respond("delete_record", 204)
+                            return
+
+                self._respond("delete_record", 404)
+
+            def _records(self, zone_id: str, query: dict[str, str]) -> dict[str, Any]:
+                size = min(int(query.get("page[size]", api.page_size)), api.page_size)
+                page = int(query.get("page[number]", 1))
+
+                with api.store.lock:
+                    records = list(api.store.records.get(zone_id, {}).items())
+
+                selected = records[(page - 1) * size : page * size]
+                has_next = page * size < len(records)
+
+                return {
+                    "data": [
+                        {"type": "dns_records", "id": record_id, "attributes": attrs}
+                        for record_id, attrs in selected
+                    ],
+                    "links": {
+                        "next": (
+                            f"{api.url}/dns_zones/{zone_id}/records"
+                            f"?page[size]={size}&page[number]={page + 1}"
+                            if has_next
+                            else None
+                        )
+                    },
+                }
+
+            def _inject(self, name: str) -> bool:
+                delay, status = api._fault()
+                if delay:
+                    sleep(delay)
+                if status:
+                    self._respond(name, status, {"errors": [{"status": status}]})
+                    return False
+                return True
+
+            def _respond_listing(self, name: str, body: dict[str, Any]) -> None:
+                if not self._inject(name):
+                    return
+
+                content = json.dumps(body).encode()
+                etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._respond(name, 304, headers={"ETag": etag})
+                else:
+                    self._respond(name, 200, content=content, headers={"ETag": etag})
+
+            def _respond(
+                self,
+                name: str,
+                status: int,
+                body: dict[str, Any] | None = None,
+                content: bytes | None = None,
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                with api._stats_lock:
+                    api.requests[name] += 1
+                    api.statuses[status] += 1
+
+                if content is None:
+                    content = json.dumps(body).encode() if body is not None else b""
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for header, value in (headers or {}).items():
+                    self.send_header(header, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    # Accept as many concurrent connections as the load test makes.
+    request_queue_size = 256
+    daemon_threads = True
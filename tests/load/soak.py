@@ -0,0 +1,307 @@
+"""Load and soak test of DnsService against the fake Exonet API.
+
+Simulates many certificates renewing in the same window: every certificate runs
+a perform/cleanup cycle with its own DnsService (as certbot creates a new
+authenticator per certificate), concurrently with the others. Failed cycles are
+cleaned up and retried, like a renewal that is run again.
+
+Usage: python -m tests.load --help
+"""
+
+from __future__ import annotations
+
+import gc
+import resource
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from certbot.errors import PluginError
+from exonetapi import Client
+from requests.exceptions import RequestException
+
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+)
+from certbot_dns_exonet.services.dns_service import DnsService
+from tests.load.fake_api import FakeExonetApi, Faults
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from certbot_dns_exonet.services.challenge_plan import Challenge
+
+
+@dataclass
+class SoakResult:
+    """The measurements of a soak run."""
+
+    certificates: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    attempts: int = 0
+    retries: int = 0
+    fail_fast: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+    duration: float = 0.0
+    # (completed certificates, RSS in KiB) samples.
+    memory: list[tuple[int, int]] = field(default_factory=list)
+    requests: dict[str, int] = field(default_factory=dict)
+    statuses: dict[int, int] = field(default_factory=dict)
+    leftover_records: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Get the number of completed certificates per second.
+
+        Returns:
+            The throughput.
+
+        """
+        return (self.succeeded + self.failed) / self.duration if self.duration else 0
+
+    @property
+    def error_rate(self) -> float:
+        """Get the fraction of failed attempts.
+
+        Returns:
+            The error rate.
+
+        """
+        return sum(self.errors.values()) / self.attempts if self.attempts else 0
+
+    def add_attempt(self, retry: bool, error: Exception | None) -> None:  # noqa: FBT001
+        """Count an attempt of a certificate.
+
+        Args:
+            retry: Whether the attempt is a retry.
+            error: The error the attempt failed with, if any.
+
+        """
+        self.attempts += 1
+        self.retries += retry
+        if error:
+            message = f"{type(error).__name__}: {str(error).split(':', 1)[0]}"
+            self.errors[message] = self.errors.get(message, 0) + 1
+            self.fail_fast += "API is unavailable" in message
+
+    def add_certificate(self, *, succeeded: bool) -> int:
+        """Count a completed certificate.
+
+        Args:
+            succeeded: Whether the certificate succeeded.
+
+        Returns:
+            The number of completed certificates.
+
+        """
+        self.succeeded += succeeded
+        self.failed += not succeeded
+
+        return self.succeeded + self.failed
+
+    def report(self) -> str:
+        """Format the measurements.
+
+        Returns:
+            The report.
+
+        """
+        lines = [
+            (
+                f"certificates   {self.certificates} "
+                f"({self.succeeded} succeeded, {self.failed} failed)"
+            ),
+            f"duration       {self.duration:.2f}s",
+            f"throughput     {self.throughput:.1f} certificates/s",
+            f"attempts       {self.attempts} ({self.retries} retries)",
+            (
+                f"error rate     {self.error_rate:.1%} of attempts "
+                f"({self.fail_fast} failed fast by the circuit breaker)"
+            ),
+            f"leftover       {self.leftover_records} records",
+            "api requests   "
+            + ", ".join(f"{name}={n}" for name, n in sorted(self.requests.items())),
+            "api statuses   "
+            + ", ".join(f"{code}={n}" for code, n in sorted(self.statuses.items())),
+        ]
+        if self.memory:
+            start, end = self.memory[0][1], self.memory[-1][1]
+            lines.append(
+                f"memory (RSS)   {start} KiB -> {end} KiB "
+                f"({end - start:+d} KiB, peak {max(rss for _, rss in self.memory)} KiB)"
+            )
+            lines.extend(
+                f"  after {done:>6} certificates: {rss} KiB"
+                for done, rss in self.memory
+            )
+        lines.extend(
+            f"  error: {error} x{n}" for error, n in sorted(self.errors.items())
+        )
+
+        return "\n".join(lines)
+
+
+def rss() -> int:
+    """Get the resident set size of this process.
+
+    Returns:
+        The current RSS in KiB, or the peak RSS where the current is unavailable.
+
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:  # noqa: PTH123
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def challenges(certificate: int, sans: int, zones: int) -> Iterator[Challenge]:
+    """Get the challenges of a certificate.
+
+    Args:
+        certificate: The number of the certificate.
+        sans: The number of names on the certificate.
+        zones: The number of distinct zones the names are spread over.
+
+    Yields:
+        The (domain, validation_name, validation) tuples.
+
+    """
+    for san in range(sans):
+        zone = f"zone{(certificate + san) % zones}.nl"
+        domain = f"cert{certificate}-san{san}.{zone}"
+        yield domain, f"_acme-challenge.{domain}", f"validation-{certificate}-{san}"
+
+
+def soak(  # noqa: PLR0913, PLR0917
+    api: FakeExonetApi,
+    certificates: int,
+    concurrency: int = 10,
+    sans: int = 2,
+    zones: int = 10,
+    max_attempts: int = 3,
+    circuit_breaker: CircuitBreaker | None = None,
+    samples: int = 10,
+) -> SoakResult:
+    """Run perform/cleanup cycles for many certificates against a fake API.
+
+    Args:
+        api: The running fake API.
+        certificates: The number of certificates.
+        concurrency: The number of certificates processed at the same time.
+        sans: The number of names per certificate.
+        zones: The number of distinct zones.
+        max_attempts: The number of attempts per certificate.
+        circuit_breaker: The circuit breaker to use, defaults to a new breaker.
+        samples: The number of memory samples to take.
+
+    Returns:
+        The measurements.
+
+    """
+    client = Client()
+    original_host = client.get_host()
+    client.set_host(api.url)
+
+    circuit_breaker = circuit_breaker or CircuitBreaker()
+    result = SoakResult(certificates=certificates)
+    lock = Lock()
+    sample_every = max(1, certificates // samples)
+
+    def cycle(certificate: int) -> None:
+        for attempt in range(max_attempts):
+            dns_service = DnsService("soak-token", circuit_breaker)
+            plan = ChallengePlan()
+            error: Exception | None = None
+            try:
+                plan = dns_service.perform_txt_records(
+                    challenges(certificate, sans, zones)
+                )
+            except IncompletePlanError as exception:
+                plan = exception.plan
+                error = exception
+            except (PluginError, RequestException) as exception:
+                error = exception
+
+            # Cleanup runs after a failed perform too, like certbot does.
+            try:
+                dns_service.del_txt_records(plan)
+            except (PluginError, RequestException) as exception:
+                error = error or exception
+
+            with lock:
+                result.add_attempt(attempt > 0, error)
+                if not error or attempt == max_attempts - 1:
+                    done = result.add_certificate(succeeded=not error)
+                    if done % sample_every == 0:
+                        gc.collect()
+                        result.memory.append((done, rss()))
+            if not error:
+                return
+
+    try:
+        result.memory.append((0, rss()))
+        start = perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(cycle, range(certificates)))
+        result.duration = perf_counter() - start
+    finally:
+        client.set_host(original_host)
+
+    result.requests = dict(api.requests)
+    result.statuses = dict(api.statuses)
+    result.leftover_records = api.record_count()
+
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the soak test from the command line.
+
+    Args:
+        argv: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = ArgumentParser(prog="python -m tests.load")
+    parser.add_argument("--certificates", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sans", type=int, default=2)
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate-limited", type=float, default=0.01)
+    parser.add_argument("--server-error", type=float, default=0.01)
+    parser.add_argument("--breaker-threshold", type=int, default=5)
+    parser.add_argument("--breaker-timeout", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limited=args.rate_limited,
+        server_error=args.server_error,
+        seed=args.seed,
+    )
+    with FakeExonetApi(faults) as api:
+        result = soak(
+            api,
+            args.certificates,
+            concurrency=args.concurrency,
+            sans=args.sans,
+            zones=args.zones,
+            max_attempts=args.attempts,
+            circuit_breaker=CircuitBreaker(
+                args.breaker_threshold, args.breaker_timeout
+            ),
+        )
+
+    sys.stdout.write(result.report() + "\n")
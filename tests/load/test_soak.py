@@ -0,0 +1,43 @@
+"""Certbot DNS Exonet tests."""
+
+from certbot_dns_exonet.clients.circuit_breaker import CircuitBreaker
+from tests.load.fake_api import FakeExonetApi, Faults
+from tests.load.soak import soak
+
+
+class TestSoak:
+    """Test the soak harness with a small load."""
+
+    def test_soak(self) -> None:
+        """Test every certificate completes and no records are left behind."""
+        with FakeExonetApi() as api:
+            result = soak(api, 20, concurrency=5, sans=3, zones=4)
+
+        assert result.succeeded == 20
+        assert result.failed == 0
+        assert result.retries == 0
+        assert result.leftover_records == 0
+        # 60 records created and deleted, 4 zones looked up at least once.
+        assert result.requests["create_record"] == 60
+        assert result.requests["delete_record"] == 60
+        assert result.requests["find_zone"] >= 4
+        assert result.memory
+
+    def test_soak_with_faults(self) -> None:
+        """Test failed certificates are retried and cleaned up."""
+        faults = Faults(rate_limited=0.05, server_error=0.05, seed=1)
+
+        with FakeExonetApi(faults) as api:
+            result = soak(
+                api,
+                20,
+                concurrency=5,
+                max_attempts=10,
+                circuit_breaker=CircuitBreaker(1000),
+            )
+
+        assert result.succeeded == 20
+        assert result.retries > 0
+        assert result.error_rate > 0
+        assert result.statuses[429] + result.statuses[503] > 0
+        assert "20 succeeded" in result.report()
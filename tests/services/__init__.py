@@ -1,7 +1,15 @@
 """Certbot DNS Exonet."""
 
+from .test_challenge_plan import TestChallengePlan
+from .test_cost_estimate import TestCostEstimate
 from .test_dns_service import TestDnsService
+from .test_record_index import TestRecordIndex
+from .test_zone_coordinator import TestZoneCoordinator
 
 __all__ = [
+    "TestChallengePlan",
+    "TestCostEstimate",
     "TestDnsService",
+    "TestRecordIndex",
+    "TestZoneCoordinator",
 ]
@@ -0,0 +1,72 @@
+"""Certbot DNS Exonet tests."""
+
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from certbot_dns_exonet.services.challenge_plan import ChallengePlan, PlannedRecord
+
+
+def _planned_record(
+    domain: str, zone_id: str, record_id: str | None = None
+) -> PlannedRecord:
+    return PlannedRecord(
+        domain=domain,
+        validation_name=f"_acme-challenge.{domain}",
+        validation="KEna0LvLAKFIcTCadLBQAH5yq_laL2PSKgNALcck5ms",
+        zone_id=zone_id,
+        zone_name=domain,
+        name="_acme-challenge",
+        content='"KEna0LvLAKFIcTCadLBQAH5yq_laL2PSKgNALcck5ms"',
+        record_id=record_id,
+    )
+
+
+class TestChallengePlan:
+    """Test the challenge plan."""
+
+    def test_planned_record_created(self) -> None:
+        """Test creating a copy of a planned record with a record id."""
+        planned = _planned_record("exodev.nl", "BqgWr8dr0XV7")
+        created = planned.created("LsaWr8dr0KSa")
+
+        # Check the original is untouched.
+        assert planned.record_id is None
+        assert created.record_id == "LsaWr8dr0KSa"
+        assert created.challenge == planned.challenge
+
+        with pytest.raises(FrozenInstanceError):
+            planned.record_id = "LsaWr8dr0KSa"  # type: ignore[misc]
+
+        assert not hasattr(planned, "__dict__")
+
+    def test_zones(self) -> None:
+        """Test grouping the planned records by zone."""
+        plan = ChallengePlan(
+            (
+                _planned_record("exodev.nl", "BqgWr8dr0XV7"),
+                _planned_record("test.nl", "VwdPr4gr2pQa"),
+                _planned_record("exodev.nl", "BqgWr8dr0XV7"),
+            )
+        )
+
+        zones = plan.zones()
+
+        # Check grouping.
+        assert list(zones) == ["BqgWr8dr0XV7", "VwdPr4gr2pQa"]
+        assert len(zones["BqgWr8dr0XV7"]) == 2
+        assert len(zones["VwdPr4gr2pQa"]) == 1
+        assert len(plan) == 3
+
+    def test_select(self) -> None:
+        """Test selecting the part of the plan for given challenges."""
+        exodev = _planned_record("exodev.nl", "BqgWr8dr0XV7")
+        test = _planned_record("test.nl", "VwdPr4gr2pQa")
+        plan = ChallengePlan((exodev, test))
+
+        selected = plan.select([test.challenge, ("other.nl", "x", "y")])
+
+        # Check selected records.
+        assert list(selected) == [test]
@@ -0,0 +1,44 @@
+"""Certbot DNS Exonet tests."""
+
+from certbot_dns_exonet.services.challenge_plan import ChallengePlan, PlannedRecord
+from certbot_dns_exonet.services.cost_estimate import CostEstimate
+
+
+class TestCostEstimate:
+    """Test the cost estimate."""
+
+    def test_report(self) -> None:
+        """Test formatting the estimate."""
+        estimate = CostEstimate(
+            plan=ChallengePlan(
+                (
+                    PlannedRecord(
+                        domain="exodev.nl",
+                        validation_name="_acme-challenge.exodev.nl",
+                        validation="KEna0LvLAKFIcTCa",
+                        zone_id="BqgWr8dr0XV7",
+                        zone_name="exodev.nl",
+                        name="_acme-challenge",
+                        content='"KEna0LvLAKFIcTCa"',
+                    ),
+                )
+            ),
+            calls={
+                "find_dns_zone_by_name": 1,
+                "post_api_resource": 1,
+                "delete_api_resource": 1,
+            },
+            sent_bytes=200,
+            received_bytes=450,
+        )
+
+        # Check the report.
+        assert estimate.report().splitlines() == [
+            "Dry run: 1 TXT records in 1 DNS zones would be created and deleted.",
+            "Predicted Exonet API calls: 3",
+            "  find_dns_zone_by_name: 1",
+            "  post_api_resource: 1",
+            "  delete_api_resource: 1",
+            "Predicted bytes: 200 sent, 450 received",
+            '  exodev.nl: _acme-challenge "KEna0LvLAKFIcTCa"',
+        ]
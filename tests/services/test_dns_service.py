@@ -1,17 +1,54 @@
 """Certbot DNS Exonet tests."""
 
+from __future__ import annotations
+
+import json
+import tracemalloc
+import warnings
+from operator import length_hint
+from threading import Barrier, current_thread
+from typing import TYPE_CHECKING
 from unittest.mock import Mock, patch
 
 import pytest
 from certbot.errors import PluginError
-from exonetapi.structures import ApiResource, ApiResourceSet
+from exonetapi.structures import ApiResource
+from requests import Session
+from requests.adapters import HTTPAdapter
+from tldextract import extract
 
+from certbot_dns_exonet.clients.dns_record import DnsRecord
+from certbot_dns_exonet.clients.exonet_client import ExonetClient
+from certbot_dns_exonet.clients.response_cache import ResponseCache
+from certbot_dns_exonet.diagnostics.profiler import Profiler
+from certbot_dns_exonet.diagnostics.tracer import ChallengeTracer
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
 from certbot_dns_exonet.services.dns_service import DnsService
+from certbot_dns_exonet.services.zone_coordinator import ZoneCoordinator
+from tests import fakes
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 class TestDnsService:
     """Test the DNS service."""
 
+    def test_pool_size(self) -> None:
+        """Test the client keeps a connection open per worker thread."""
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        adapter = dns_service.client.session.get_adapter("https://api.exonet.nl")
+
+        # Check the pool size.
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == (
+            DnsService.prefetch_workers + DnsService.pipeline_workers
+        )
+
     @patch(
         "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
     )
@@ -94,12 +131,12 @@ class TestDnsService:
     @patch(
         "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
     )
-    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.get_relation")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
     @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
     def test_del_txt_record(
         self,
         mock_delete_api_resource: Mock,
-        mock_get_relation: Mock,
+        mock_list_dns_records: Mock,
         mock_find_dns_zone_by_name: Mock,
     ) -> None:
         """Test deleting TXT record.
@@ -107,8 +144,8 @@ class TestDnsService:
         Args:
             mock_delete_api_resource: Mock of
                 certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
-            mock_get_relation: Mock of
-                certbot_dns_exonet.clients.exonet_client.ExonetClient.get_relation.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
              mock_find_dns_zone_by_name (Mock): Mock of
                 certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
 
@@ -118,15 +155,20 @@ class TestDnsService:
 
         mock_find_dns_zone_by_name.return_value = zone
 
-        record = ApiResource({"type": "dns_records", "id": "LsaWr8dr0KSa"})
-        record.attribute("name", "_acme-challenge")
-        record.attribute("type", "TXT")
-        record.attribute("content", '"KEna0LvLAKFIcTCadLBQAH5yq_laL2PSKgNALcck5ms"')
-
-        records = ApiResourceSet()
-        records.add_resource(record)
-
-        mock_get_relation.return_value = records
+        mock_list_dns_records.return_value = [
+            DnsRecord(
+                id="LsaWr8dr0KSa",
+                type="TXT",
+                name="_acme-challenge",
+                content='"KEna0LvLAKFIcTCadLBQAH5yq_laL2PSKgNALcck5ms"',
+            ),
+            DnsRecord(
+                id="PqeWr3dr0JSb",
+                type="TXT",
+                name="_acme-challenge",
+                content='"H5yq_laL2PSKgNALcck5ms"',
+            ),
+        ]
 
         dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
         dns_service.del_txt_record(
@@ -137,24 +179,23 @@ class TestDnsService:
 
         # Check mock calls.
         assert mock_find_dns_zone_by_name.call_count == 1
-        assert mock_get_relation.call_count == 1
+        assert mock_list_dns_records.call_count == 1
         assert mock_delete_api_resource.call_count == 1
 
         # Check call args.
         assert mock_find_dns_zone_by_name.call_args[0][0] == "exodev.nl"
-        assert mock_get_relation.call_args[0][0].id() == "BqgWr8dr0XV7"
-        assert mock_get_relation.call_args[0][1] == "records"
+        assert mock_list_dns_records.call_args[0][0] == "BqgWr8dr0XV7"
         assert mock_delete_api_resource.call_args[0][0].id() == "LsaWr8dr0KSa"
 
     @patch(
         "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
     )
-    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.get_relation")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
     @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
     def test_del_txt_record_no_records(
         self,
         mock_delete_api_resource: Mock,
-        mock_get_relation: Mock,
+        mock_list_dns_records: Mock,
         mock_find_dns_zone_by_name: Mock,
     ) -> None:
         """Test deleting TXT record when no records are found.
@@ -162,8 +203,8 @@ class TestDnsService:
         Args:
             mock_delete_api_resource: Mock of
                 certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
-            mock_get_relation: Mock of
-                certbot_dns_exonet.clients.exonet_client.ExonetClient.get_relation.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
              mock_find_dns_zone_by_name (Mock): Mock of
                 certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
 
@@ -173,7 +214,7 @@ class TestDnsService:
 
         mock_find_dns_zone_by_name.return_value = zone
 
-        mock_get_relation.return_value = None
+        mock_list_dns_records.return_value = None
 
         dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
 
@@ -185,14 +226,827 @@ class TestDnsService:
             )
 
         # Check error message.
-        assert e_info.value.args[0] == f"Unable to find DNS records for {zone}."
+        assert e_info.value.args[0] == "Unable to find DNS records for exodev.nl."
 
         # Check mock calls.
         assert mock_find_dns_zone_by_name.call_count == 1
-        assert mock_get_relation.call_count == 1
+        assert mock_list_dns_records.call_count == 1
         assert mock_delete_api_resource.call_count == 0
 
         # Check call args.
         assert mock_find_dns_zone_by_name.call_args[0][0] == "exodev.nl"
-        assert mock_get_relation.call_args[0][0].id() == "BqgWr8dr0XV7"
-        assert mock_get_relation.call_args[0][1] == "records"
+        assert mock_list_dns_records.call_args[0][0] == "BqgWr8dr0XV7"
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_add_txt_records_plan(
+        self, mock_post_api_resource: Mock, mock_find_dns_zone_by_name: Mock
+    ) -> None:
+        """Test planning and adding TXT records for multiple challenges.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        zone = ApiResource({"type": "dns_zones", "id": "BqgWr8dr0XV7"})
+        zone.attribute("name", "exodev.nl")
+
+        mock_find_dns_zone_by_name.return_value = zone
+        mock_post_api_resource.side_effect = [
+            ApiResource({"type": "dns_records", "id": "LsaWr8dr0KSa"}),
+            ApiResource({"type": "dns_records", "id": "PqeWr3dr0JSb"}),
+        ]
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        plan = dns_service.plan_txt_records(
+            [
+                ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ"),
+                ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL2PSK"),
+            ]
+        )
+        created_plan = dns_service.add_txt_records(plan)
+
+        # Check mock calls, the zone is only looked up once.
+        assert mock_find_dns_zone_by_name.call_count == 1
+        assert mock_post_api_resource.call_count == 2
+
+        # Check the plan.
+        assert [record.name for record in plan] == [
+            "_acme-challenge",
+            "_acme-challenge.www",
+        ]
+        assert [record.content for record in plan] == [
+            '"KEna0LvLAKFIcTCadLBQ"',
+            '"H5yq_laL2PSK"',
+        ]
+        assert [record.record_id for record in plan] == [None, None]
+        assert [record.record_id for record in created_plan] == [
+            "LsaWr8dr0KSa",
+            "PqeWr3dr0JSb",
+        ]
+
+        # Check call args.
+        posted = mock_post_api_resource.call_args_list[1][0][0]
+        assert posted.attribute("name") == "_acme-challenge.www"
+        assert posted.relationship("zone").id() == "BqgWr8dr0XV7"
+
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    def test_del_txt_records_plan(
+        self, mock_delete_api_resource: Mock, mock_list_dns_records: Mock
+    ) -> None:
+        """Test deleting TXT records of a plan with known record ids.
+
+        Args:
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
+
+        """
+        plan = ChallengePlan(
+            (
+                PlannedRecord(
+                    domain="exodev.nl",
+                    validation_name="_acme-challenge.exodev.nl",
+                    validation="KEna0LvLAKFIcTCadLBQ",
+                    zone_id="BqgWr8dr0XV7",
+                    zone_name="exodev.nl",
+                    name="_acme-challenge",
+                    content='"KEna0LvLAKFIcTCadLBQ"',
+                    record_id="LsaWr8dr0KSa",
+                ),
+            )
+        )
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        dns_service.del_txt_records(plan)
+
+        # Check mock calls, no records are listed.
+        assert mock_list_dns_records.call_count == 0
+        assert mock_delete_api_resource.call_count == 1
+
+        # Check call args.
+        assert mock_delete_api_resource.call_args[0][0].id() == "LsaWr8dr0KSa"
+
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    def test_del_txt_records_unavailable(
+        self,
+        mock_delete_api_resource: Mock,
+        mock_list_dns_records: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test records deleted before the API became unavailable are forgotten.
+
+        Args:
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
+            tmp_path: Temporary directory.
+
+        """
+        mock_list_dns_records.return_value = [
+            DnsRecord("LsaWr8dr0KSa", "TXT", "_acme-challenge", '"KEna0LvLAKFIcTCa"'),
+            DnsRecord("PqeWr3dr0JSb", "TXT", "_acme-challenge", '"H5yq_laL2PSK"'),
+        ]
+        mock_delete_api_resource.side_effect = [
+            None,
+            PluginError("The Exonet API is unavailable."),
+        ]
+        plan = ChallengePlan(
+            tuple(
+                PlannedRecord(
+                    domain="exodev.nl",
+                    validation_name="_acme-challenge.exodev.nl",
+                    validation=validation,
+                    zone_id="BqgWr8dr0XV7",
+                    zone_name="exodev.nl",
+                    name="_acme-challenge",
+                    content=f'"{validation}"',
+                )
+                for validation in ("KEna0LvLAKFIcTCa", "H5yq_laL2PSK")
+            )
+        )
+
+        coordinator = ZoneCoordinator(tmp_path)
+        dns_service = DnsService(
+            "kaSD0ffAD1ldSA92A0KODkaksda02KDAK", coordinator=coordinator
+        )
+        with pytest.raises(PluginError, match="unavailable"):
+            dns_service.del_txt_records(plan)
+
+        # Check mock calls.
+        assert mock_list_dns_records.call_count == 1
+        assert mock_delete_api_resource.call_count == 2
+
+        # Only the first record is removed from the index and shared listing.
+        keys = [("TXT", "_acme-challenge", record.content) for record in plan]
+        assert dns_service.index.find("BqgWr8dr0XV7", keys) == {
+            keys[1]: ["PqeWr3dr0JSb"]
+        }
+        shared = coordinator.records("BqgWr8dr0XV7", list) or []
+        assert [record.id for record in shared] == ["PqeWr3dr0JSb"]
+
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    def test_del_txt_records_coordinated(
+        self,
+        mock_delete_api_resource: Mock,
+        mock_list_dns_records: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test coordinated processes share the record listing of a zone.
+
+        Args:
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
+            tmp_path: Temporary directory.
+
+        """
+        mock_list_dns_records.return_value = [
+            DnsRecord("LsaWr8dr0KSa", "TXT", "_acme-challenge", '"KEna0LvLAKFIcTCa"'),
+            DnsRecord("PqeWr3dr0JSb", "TXT", "_acme-challenge", '"H5yq_laL2PSK"'),
+        ]
+
+        def plan(validation: str) -> ChallengePlan:
+            return ChallengePlan(
+                (
+                    PlannedRecord(
+                        domain="exodev.nl",
+                        validation_name="_acme-challenge.exodev.nl",
+                        validation=validation,
+                        zone_id="BqgWr8dr0XV7",
+                        zone_name="exodev.nl",
+                        name="_acme-challenge",
+                        content=f'"{validation}"',
+                    ),
+                )
+            )
+
+        # Two processes sharing the coordination directory.
+        DnsService(
+            "kaSD0ffAD1ldSA92A0KODkaksda02KDAK", coordinator=ZoneCoordinator(tmp_path)
+        ).del_txt_records(plan("KEna0LvLAKFIcTCa"))
+        DnsService(
+            "kaSD0ffAD1ldSA92A0KODkaksda02KDAK", coordinator=ZoneCoordinator(tmp_path)
+        ).del_txt_records(plan("H5yq_laL2PSK"))
+
+        # Check mock calls, the zone is only listed once.
+        assert mock_list_dns_records.call_count == 1
+        assert mock_delete_api_resource.call_count == 2
+
+        # Check call args.
+        assert [
+            call[0][0].id() for call in mock_delete_api_resource.call_args_list
+        ] == ["LsaWr8dr0KSa", "PqeWr3dr0JSb"]
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    def test_prefetch_zones(self, mock_find_dns_zone_by_name: Mock) -> None:
+        """Test planning TXT records uses the prefetched zones.
+
+        Args:
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        threads = []
+
+        def find_dns_zone_by_name(domain: str) -> ApiResource | None:
+            threads.append(current_thread().name)
+            return fakes.find_dns_zone_by_name(domain)
+
+        mock_find_dns_zone_by_name.side_effect = find_dns_zone_by_name
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        dns_service.prefetch_zones(["exodev.nl", "*.exodev.nl", "test.nl"])
+        plan = dns_service.plan_txt_records(
+            [
+                ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ"),
+                ("test.nl", "_acme-challenge.test.nl", "H5yq_laL2PSK"),
+            ]
+        )
+
+        # Check mock calls, each zone is looked up once in the background.
+        assert mock_find_dns_zone_by_name.call_count == 2
+        assert all(name.startswith("dns-exonet-prefetch") for name in threads)
+
+        # Check the plan.
+        assert [record.zone_id for record in plan] == ["EXODEV.NL", "TEST.NL"]
+
+        executor = dns_service._executor
+        dns_service.close()
+
+        # Check the prefetch threads are shut down.
+        assert executor is not None
+        assert executor._shutdown
+        assert dns_service._executor is None
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    def test_prefetch_zones_error(self, mock_find_dns_zone_by_name: Mock) -> None:
+        """Test a zone is looked up again when prefetching it failed.
+
+        Args:
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        zone = ApiResource({"type": "dns_zones", "id": "BqgWr8dr0XV7"})
+        zone.attribute("name", "exodev.nl")
+
+        mock_find_dns_zone_by_name.side_effect = [PluginError("Broken"), zone]
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        dns_service.prefetch_zones(["exodev.nl"])
+        plan = dns_service.plan_txt_records(
+            [("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ")]
+        )
+
+        # Check mock calls.
+        assert mock_find_dns_zone_by_name.call_count == 2
+
+        # Check the plan.
+        assert [record.zone_id for record in plan] == ["BqgWr8dr0XV7"]
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    def test_del_txt_record_indexed(
+        self,
+        mock_delete_api_resource: Mock,
+        mock_list_dns_records: Mock,
+        mock_post_api_resource: Mock,
+        mock_find_dns_zone_by_name: Mock,
+    ) -> None:
+        """Test deleting TXT records uses the record index.
+
+        Args:
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_list_dns_records: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.list_dns_records.
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        zone = ApiResource({"type": "dns_zones", "id": "BqgWr8dr0XV7"})
+        zone.attribute("name", "exodev.nl")
+
+        mock_find_dns_zone_by_name.return_value = zone
+        mock_post_api_resource.return_value = ApiResource(
+            {"type": "dns_records", "id": "LsaWr8dr0KSa"}
+        )
+        mock_list_dns_records.return_value = [
+            DnsRecord("PqeWr3dr0JSb", "TXT", "_acme-challenge.www", '"H5yq_laL2PSK"'),
+            DnsRecord("XreWr1dr0PSc", "TXT", "_acme-challenge.api", '"Ppq2_lbR2MSK"'),
+        ]
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+
+        # The created record is found in the index, without listing the zone.
+        dns_service.add_txt_record(
+            "exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ"
+        )
+        dns_service.del_txt_record(
+            "exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ"
+        )
+
+        # Check mock calls.
+        assert mock_list_dns_records.call_count == 0
+        assert mock_delete_api_resource.call_count == 1
+
+        # A record created elsewhere seeds the index with a single listing.
+        dns_service.del_txt_record(
+            "www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL2PSK"
+        )
+        dns_service.del_txt_record(
+            "api.exodev.nl", "_acme-challenge.api.exodev.nl", "Ppq2_lbR2MSK"
+        )
+        dns_service.del_txt_record(
+            "www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL2PSK"
+        )
+
+        # Check mock calls, the zone is listed once.
+        assert mock_list_dns_records.call_count == 1
+        assert mock_delete_api_resource.call_count == 3
+
+        # Check call args.
+        assert [
+            call[0][0].id() for call in mock_delete_api_resource.call_args_list
+        ] == ["LsaWr8dr0KSa", "PqeWr3dr0JSb", "XreWr1dr0PSc"]
+
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient._get")
+    @patch.object(ApiResource, "post")
+    @patch.object(ApiResource, "delete")
+    def test_trace(
+        self, mock_delete: Mock, mock_post: Mock, mock_get: Mock, tmp_path: Path
+    ) -> None:
+        """Test the work done per challenge is traced.
+
+        Args:
+            mock_delete: Mock of
+                exonetapi.structures.ApiResource.delete.
+            mock_post: Mock of
+                exonetapi.structures.ApiResource.post.
+            mock_get: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient._get.
+            tmp_path: Temporary directory.
+
+        """
+        mock_get.return_value = (
+            b'{"data": [{"type": "dns_zones", "id": "BqgWr8dr0XV7", '
+            b'"attributes": {"name": "exodev.nl"}}]}'
+        )
+        mock_post.side_effect = [
+            ApiResource({"type": "dns_records", "id": "LsaWr8dr0KSa"}),
+            ApiResource({"type": "dns_records", "id": "PqeWr3dr0JSb"}),
+        ]
+
+        tracer = ChallengeTracer(tmp_path / "trace.jsonl")
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK", tracer=tracer)
+        plan = dns_service.add_txt_records(
+            dns_service.plan_txt_records(
+                [
+                    ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCa"),
+                    ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL"),
+                ]
+            )
+        )
+        dns_service.del_txt_records(plan)
+        tracer.write(plan)
+
+        traces = [
+            json.loads(line)
+            for line in tracer.path.read_text(encoding="utf-8").splitlines()
+        ]
+
+        # Check mock calls.
+        assert mock_get.call_count == 1
+        assert mock_post.call_count == 2
+        assert mock_delete.call_count == 2
+
+        # Check the traces, the zone lookup is attributed to the first challenge.
+        assert [trace["domain"] for trace in traces] == ["exodev.nl", "www.exodev.nl"]
+        assert traces[0]["api_calls_by_name"] == {
+            "find_dns_zone_by_name": 1,
+            "post_api_resource": 1,
+            "delete_api_resource": 1,
+        }
+        assert traces[1]["api_calls_by_name"] == {
+            "post_api_resource": 1,
+            "delete_api_resource": 1,
+        }
+        assert all(trace["create"] > 0 for trace in traces)
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_perform_txt_records(
+        self, mock_post_api_resource: Mock, mock_find_dns_zone_by_name: Mock
+    ) -> None:
+        """Test the registered domains are performed concurrently.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        # Every lookup waits for the others, so this only passes concurrently.
+        barrier = Barrier(3, timeout=5)
+
+        def find_dns_zone_by_name(domain: str) -> ApiResource | None:
+            barrier.wait()
+            return fakes.find_dns_zone_by_name(domain)
+
+        mock_find_dns_zone_by_name.side_effect = find_dns_zone_by_name
+        mock_post_api_resource.side_effect = fakes.post_api_resource
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        with patch(
+            "certbot_dns_exonet.services.dns_service.extract", wraps=extract
+        ) as mock_extract:
+            plan = dns_service.perform_txt_records(
+                [
+                    ("exodev.nl", "_acme-challenge.exodev.nl", "a"),
+                    ("test.nl", "_acme-challenge.test.nl", "b"),
+                    ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "c"),
+                    ("example.nl", "_acme-challenge.example.nl", "d"),
+                ]
+            )
+
+        # Check mock calls, each zone is looked up once.
+        assert mock_find_dns_zone_by_name.call_count == 3
+        assert mock_post_api_resource.call_count == 4
+        # The registered domain of each challenge is computed once.
+        assert mock_extract.call_count == 4
+        assert [record.registered_domain for record in plan] == [
+            "exodev.nl",
+            "test.nl",
+            "exodev.nl",
+            "example.nl",
+        ]
+
+        # Check the plan is in the order of the challenges.
+        assert [(record.zone_id, record.record_id) for record in plan] == [
+            ("EXODEV.NL", '"a"-id'),
+            ("TEST.NL", '"b"-id'),
+            ("EXODEV.NL", '"c"-id'),
+            ("EXAMPLE.NL", '"d"-id'),
+        ]
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_perform_txt_records_profiled(
+        self,
+        mock_post_api_resource: Mock,
+        mock_find_dns_zone_by_name: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test the work done in the pipeline threads is profiled.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+            tmp_path: Temporary directory.
+
+        """
+        mock_find_dns_zone_by_name.side_effect = fakes.find_dns_zone_by_name
+        mock_post_api_resource.side_effect = fakes.post_api_resource
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        dns_service.profiler = Profiler(tmp_path)
+        with dns_service.profiler.profile("perform"):
+            dns_service.perform_txt_records(
+                [
+                    ("exodev.nl", "_acme-challenge.exodev.nl", "a"),
+                    ("test.nl", "_acme-challenge.test.nl", "b"),
+                ]
+            )
+
+        report = dns_service.profiler.write_report().read_text(encoding="utf-8")
+
+        # Check the CPU statistics include the pipeline threads.
+        assert "_perform_domain" in report
+        assert "plan_txt_records" in report
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_perform_txt_records_error(
+        self, mock_post_api_resource: Mock, mock_find_dns_zone_by_name: Mock
+    ) -> None:
+        """Test the records created before a failure are kept in the error.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+
+        def post_api_resource(record: ApiResource) -> ApiResource:
+            if record.attribute("content") == '"c"':
+                msg = "Error adding ApiResource using the Exonet API"
+                raise PluginError(msg)
+            return fakes.post_api_resource(record)
+
+        mock_find_dns_zone_by_name.side_effect = fakes.find_dns_zone_by_name
+        mock_post_api_resource.side_effect = post_api_resource
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+
+        with pytest.raises(IncompletePlanError) as e_info:
+            dns_service.perform_txt_records(
+                [
+                    ("missing.nl", "_acme-challenge.missing.nl", "a"),
+                    ("test.nl", "_acme-challenge.test.nl", "b"),
+                    ("test.nl", "_acme-challenge.test.nl", "c"),
+                    ("exodev.nl", "_acme-challenge.exodev.nl", "d"),
+                ]
+            )
+
+        # Check error message.
+        assert e_info.value.args[0] == (
+            "Unable to find DNS zone for missing.nl. Zone missing.nl not found."
+        )
+
+        # Check the plan, without the missing zone.
+        assert [
+            (record.validation, record.record_id) for record in e_info.value.plan
+        ] == [
+            ("b", '"b"-id'),
+            ("c", None),
+            ("d", '"d"-id'),
+        ]
+
+        # Check the created records are indexed.
+        assert dns_service.index.find(
+            "TEST.NL", [("TXT", "_acme-challenge", '"b"')]
+        ) == {("TXT", "_acme-challenge", '"b"'): ['"b"-id']}
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_perform_txt_records_unexpected_error(
+        self, mock_post_api_resource: Mock, mock_find_dns_zone_by_name: Mock
+    ) -> None:
+        """Test the plans of the other domains are kept on an unexpected error.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+
+        def post_api_resource(record: ApiResource) -> ApiResource:
+            if record.attribute("content") == '"b"':
+                msg = "Unexpected response"
+                raise ValueError(msg)
+            return fakes.post_api_resource(record)
+
+        mock_find_dns_zone_by_name.side_effect = fakes.find_dns_zone_by_name
+        mock_post_api_resource.side_effect = post_api_resource
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+
+        with pytest.raises(IncompletePlanError) as e_info:
+            dns_service.perform_txt_records(
+                [
+                    ("exodev.nl", "_acme-challenge.exodev.nl", "a"),
+                    ("test.nl", "_acme-challenge.test.nl", "b"),
+                ]
+            )
+
+        # Check the error is chained.
+        assert e_info.value.args[0] == "Unexpected response"
+        assert isinstance(e_info.value.__cause__, IncompletePlanError)
+        assert isinstance(e_info.value.__cause__.__cause__, ValueError)
+
+        # Check the plan includes the records of the other domain.
+        assert [
+            (record.validation, record.record_id) for record in e_info.value.plan
+        ] == [
+            ("a", '"a"-id'),
+            ("b", None),
+        ]
+
+    @patch.object(Session, "get")
+    @patch.object(ApiResource, "post")
+    def test_estimate_txt_records(self, mock_post: Mock, mock_get: Mock) -> None:
+        """Test estimating the API load only looks up the DNS zones.
+
+        Args:
+            mock_post: Mock of
+                exonetapi.structures.ApiResource.post.
+            mock_get: Mock of
+                requests.Session.get.
+
+        """
+        content = (
+            b'{"data": [{"type": "dns_zones", "id": "BqgWr8dr0XV7", '
+            b'"attributes": {"name": "exodev.nl"}}]}'
+        )
+        mock_get.return_value = Mock(status_code=200, headers={}, content=content)
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        estimate = dns_service.estimate_txt_records(
+            [
+                ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCa"),
+                ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL"),
+            ]
+        )
+
+        # Check mock calls, nothing is written.
+        assert mock_get.call_count == 1
+        assert mock_post.call_count == 0
+
+        # Check the estimate.
+        assert [record.name for record in estimate.plan] == [
+            "_acme-challenge",
+            "_acme-challenge.www",
+        ]
+        assert estimate.calls == {
+            "find_dns_zone_by_name": 1,
+            "post_api_resource": 2,
+            "delete_api_resource": 2,
+        }
+        assert estimate.total_calls == 5
+
+        # The request bodies are sized as exonetapi serializes them.
+        record = {
+            "type": "dns_records",
+            "attributes": {
+                "type": "TXT",
+                "name": "_acme-challenge",
+                "content": '"KEna0LvLAKFIcTCa"',
+                "ttl": 3600,
+            },
+            "relationships": {
+                "zone": {"data": {"type": "dns_zones", "id": "BqgWr8dr0XV7"}}
+            },
+        }
+        first = len(json.dumps({"data": record}))
+        assert estimate.sent_bytes == 2 * first + len(".www") + len("H5yq_laL") - len(
+            "KEna0LvLAKFIcTCa"
+        )
+        assert estimate.received_bytes > len(content) + estimate.sent_bytes
+
+    @patch(
+        "certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name"
+    )
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource")
+    @patch("certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource")
+    def test_perform_txt_records_chunked(
+        self,
+        mock_post_api_resource: Mock,
+        mock_delete_api_resource: Mock,
+        mock_find_dns_zone_by_name: Mock,
+    ) -> None:
+        """Test challenges are performed in chunks, evicting zones no longer needed.
+
+        Args:
+            mock_post_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.post_api_resource.
+            mock_delete_api_resource: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.delete_api_resource.
+            mock_find_dns_zone_by_name: Mock of
+                certbot_dns_exonet.clients.exonet_client.ExonetClient.find_dns_zone_by_name.
+
+        """
+        mock_find_dns_zone_by_name.side_effect = fakes.find_dns_zone_by_name
+        mock_post_api_resource.side_effect = fakes.post_api_resource
+
+        challenges = iter(
+            [
+                ("exodev.nl", "_acme-challenge.exodev.nl", "a"),
+                ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "b"),
+                ("mail.exodev.nl", "_acme-challenge.mail.exodev.nl", "c"),
+                ("test.nl", "_acme-challenge.test.nl", "d"),
+                ("example.nl", "_acme-challenge.example.nl", "e"),
+            ]
+        )
+
+        dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        plans = dns_service.perform_txt_records_chunked(challenges, chunk_size=2)
+
+        # Check the challenges are read lazily.
+        assert [record.validation for record in next(plans)] == ["a", "b"]
+        assert length_hint(challenges) == 3
+
+        # Check the zone used by the next chunk is kept, the others are evicted.
+        assert [record.validation for record in next(plans)] == ["c", "d"]
+        assert dns_service.index.find("EXODEV.NL", [("TXT", "_acme-challenge", '"a"')])
+        assert [record.validation for record in next(plans)] == ["e"]
+        assert not dns_service.index.find(
+            "EXODEV.NL", [("TXT", "_acme-challenge", '"a"')]
+        )
+        assert next(plans, None) is None
+        assert dns_service.index.size == 0
+        assert not dns_service._zones
+
+        # Check mock calls, the kept zone is not looked up again.
+        assert mock_find_dns_zone_by_name.call_count == 3
+        assert mock_post_api_resource.call_count == 5
+
+        dns_service.del_txt_records_chunked(
+            (
+                record.created(f"{record.validation}-id")
+                for record in dns_service.plan_txt_records(
+                    [
+                        ("exodev.nl", "_acme-challenge.exodev.nl", "a"),
+                        ("test.nl", "_acme-challenge.test.nl", "d"),
+                        ("example.nl", "_acme-challenge.example.nl", "e"),
+                    ]
+                )
+            ),
+            chunk_size=2,
+        )
+
+        # Check mock calls, the records are deleted by their id.
+        assert mock_delete_api_resource.call_count == 3
+
+    def test_perform_txt_records_chunked_memory(self) -> None:
+        """Test the peak memory use does not grow with the number of challenges."""
+
+        def peak(challenge_count: int) -> int:
+            dns_service = DnsService("kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+            # A registered domain per chunk, so every zone is evicted after its
+            # chunk. Its challenges are performed inline: coverage would count a
+            # tracer per pipeline thread.
+            challenges = (
+                (
+                    f"domain{i // 100}.nl",
+                    f"_acme-challenge.{i}.domain{i // 100}.nl",
+                    f"KEna0LvLAKFIcTCadLBQAH5yq_laL2PSKgNA{i:08}",
+                )
+                for i in range(challenge_count)
+            )
+
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            for plan in dns_service.perform_txt_records_chunked(challenges, 100):
+                assert len(plan) == 100
+
+            return tracemalloc.get_traced_memory()[1] - start
+
+        with (
+            warnings.catch_warnings(),
+            # Not mocks, which would keep every call.
+            patch.object(
+                ExonetClient,
+                "find_dns_zone_by_name",
+                staticmethod(fakes.find_dns_zone_by_name),
+            ),
+            patch.object(
+                ExonetClient, "post_api_resource", staticmethod(fakes.post_api_resource)
+            ),
+        ):
+            # Recorded warnings would be counted too.
+            warnings.simplefilter("ignore", DeprecationWarning)
+            tracemalloc.start()
+            try:
+                # Warm up, e.g. the domain name parsing.
+                peak(100)
+                peaks = {count: peak(count) for count in (100, 1_000, 10_000)}
+            finally:
+                tracemalloc.stop()
+
+        # Check the peak stays flat, while the challenges grow a hundredfold.
+        assert peaks[10_000] < 2 * peaks[100], peaks
+
+        # Check the memory ceiling is split between the index and the cache.
+        dns_service = DnsService(
+            "kaSD0ffAD1ldSA92A0KODkaksda02KDAK", memory_ceiling=64 * 1024
+        )
+        assert dns_service.index.max_bytes == 32 * 1024
+        assert dns_service.client.response_cache is ResponseCache.shared()
+        assert ResponseCache.shared().max_bytes == 32 * 1024
@@ -0,0 +1,86 @@
+"""Certbot DNS Exonet tests."""
+
+from certbot_dns_exonet.clients.dns_record import DnsRecord
+from certbot_dns_exonet.services.record_index import RecordIndex
+
+RECORDS = [
+    DnsRecord("LsaWr8dr0KSa", "TXT", "_acme-challenge", '"KEna0LvLAKFIcTCadLBQ"'),
+    DnsRecord("PqeWr3dr0JSb", "TXT", "_acme-challenge", '"KEna0LvLAKFIcTCadLBQ"'),
+    DnsRecord("XreWr1dr0PSc", "A", "www", "192.0.2.1"),
+]
+
+KEY = ("TXT", "_acme-challenge", '"KEna0LvLAKFIcTCadLBQ"')
+
+
+class TestRecordIndex:
+    """Test the record index."""
+
+    def test_seed(self) -> None:
+        """Test finding records of a seeded zone."""
+        index = RecordIndex()
+        index.seed("BqgWr8dr0XV7", RECORDS)
+
+        # Check response data.
+        assert index.is_seeded("BqgWr8dr0XV7")
+        assert not index.is_seeded("WqgWr8dr0XV8")
+        assert index.find("BqgWr8dr0XV7", [KEY, ("A", "www", "192.0.2.2")]) == {
+            KEY: ["LsaWr8dr0KSa", "PqeWr3dr0JSb"]
+        }
+        assert index.find("WqgWr8dr0XV8", [KEY]) == {}
+
+    def test_add_and_remove(self) -> None:
+        """Test the index is updated incrementally."""
+        index = RecordIndex()
+        index.add("BqgWr8dr0XV7", RECORDS[:1])
+
+        # Check created records are found without seeding the zone.
+        assert not index.is_seeded("BqgWr8dr0XV7")
+        assert index.find("BqgWr8dr0XV7", [KEY]) == {KEY: ["LsaWr8dr0KSa"]}
+
+        index.seed("BqgWr8dr0XV7", RECORDS)
+        index.add(
+            "BqgWr8dr0XV7", [DnsRecord("ZteWr5dr0QSd", "TXT", "_acme-challenge", '"x"')]
+        )
+        index.remove("BqgWr8dr0XV7", ["LsaWr8dr0KSa", "XreWr1dr0PSc", "unknown"])
+
+        # Check response data.
+        assert index.find(
+            "BqgWr8dr0XV7",
+            [KEY, ("TXT", "_acme-challenge", '"x"'), ("A", "www", "192.0.2.1")],
+        ) == {
+            KEY: ["PqeWr3dr0JSb"],
+            ("TXT", "_acme-challenge", '"x"'): ["ZteWr5dr0QSd"],
+        }
+
+        index.remove("BqgWr8dr0XV7", ["PqeWr3dr0JSb"])
+
+        # Check response data.
+        assert index.find("BqgWr8dr0XV7", [KEY]) == {}
+
+    def test_max_bytes(self) -> None:
+        """Test the least recently used zones are evicted beyond the budget."""
+        index = RecordIndex()
+        index.seed("BqgWr8dr0XV7", RECORDS)
+        zone_size = index.size
+
+        index = RecordIndex(max_bytes=2 * zone_size)
+        index.seed("BqgWr8dr0XV7", RECORDS)
+        index.seed("WqgWr8dr0XV8", RECORDS)
+        # Use the first zone, so the second zone is the least recently used.
+        assert index.find("BqgWr8dr0XV7", [KEY])
+        index.seed("ZqgWr8dr0XV9", RECORDS)
+
+        # Check response data.
+        assert index.size == 2 * zone_size
+        assert index.is_seeded("BqgWr8dr0XV7")
+        assert not index.is_seeded("WqgWr8dr0XV8")
+        assert index.find("WqgWr8dr0XV8", [KEY]) == {}
+        assert index.is_seeded("ZqgWr8dr0XV9")
+
+        index.remove("ZqgWr8dr0XV9", ["LsaWr8dr0KSa"])
+        index.evict("BqgWr8dr0XV7")
+
+        # Check response data.
+        assert not index.is_seeded("BqgWr8dr0XV7")
+        assert index.find("BqgWr8dr0XV7", [KEY]) == {}
+        assert 0 < index.size < zone_size
@@ -0,0 +1,127 @@
+"""Certbot DNS Exonet tests."""
+
+import fcntl
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from certbot_dns_exonet.clients.dns_record import DnsRecord
+from certbot_dns_exonet.services.zone_coordinator import ZoneCoordinator
+
+RECORDS = [
+    DnsRecord("LsaWr8dr0KSa", "TXT", "_acme-challenge", '"KEna0LvLAKFIcTCadLBQ"'),
+    DnsRecord("PqeWr3dr0JSb", "A", "www", "192.0.2.1"),
+]
+
+
+class TestZoneCoordinator:
+    """Test the zone coordinator."""
+
+    def test_lock(self, tmp_path: Path) -> None:
+        """Test the zone lock is exclusive.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        coordinator = ZoneCoordinator(tmp_path / "coordination")
+
+        with (
+            coordinator.lock("BqgWr8dr0XV7"),
+            (tmp_path / "coordination" / "BqgWr8dr0XV7.lock").open("a") as other,
+            pytest.raises(BlockingIOError),
+        ):
+            fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        # Check the lock is released.
+        with (tmp_path / "coordination" / "BqgWr8dr0XV7.lock").open("a") as other:
+            fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def test_records_shared(self, tmp_path: Path) -> None:
+        """Test the record listing is fetched once and shared.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        fetch = Mock(return_value=RECORDS)
+
+        first = ZoneCoordinator(tmp_path).records("BqgWr8dr0XV7", fetch)
+        second = ZoneCoordinator(tmp_path).records("BqgWr8dr0XV7", fetch)
+
+        # Check mock calls.
+        assert fetch.call_count == 1
+
+        # Check response data.
+        assert first == RECORDS
+        assert second == RECORDS
+
+    @patch("certbot_dns_exonet.services.zone_coordinator.time")
+    def test_records_expire(self, mock_time: Mock, tmp_path: Path) -> None:
+        """Test the shared record listing is fetched again when expired.
+
+        Args:
+            mock_time: Mock of time.time.
+            tmp_path: Temporary directory.
+
+        """
+        fetch = Mock(return_value=RECORDS)
+        coordinator = ZoneCoordinator(tmp_path, max_age=60)
+
+        mock_time.return_value = 1000
+        coordinator.records("BqgWr8dr0XV7", fetch)
+        mock_time.return_value = 1061
+        coordinator.records("BqgWr8dr0XV7", fetch)
+
+        # Check mock calls.
+        assert fetch.call_count == 2
+
+    def test_records_not_found(self, tmp_path: Path) -> None:
+        """Test nothing is shared when no records are found.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        fetch = Mock(return_value=None)
+        coordinator = ZoneCoordinator(tmp_path)
+
+        # Check response data.
+        assert coordinator.records("BqgWr8dr0XV7", fetch) is None
+        assert not (tmp_path / "BqgWr8dr0XV7.json").exists()
+
+    def test_records_created_and_deleted(self, tmp_path: Path) -> None:
+        """Test created and deleted records update the shared listing.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        created = DnsRecord("QwrTy5dr0Lop", "TXT", "_acme-challenge", '"H5yq"')
+        coordinator = ZoneCoordinator(tmp_path)
+
+        # Nothing is shared before the listing is fetched.
+        coordinator.records_created("BqgWr8dr0XV7", [created])
+        assert not (tmp_path / "BqgWr8dr0XV7.json").exists()
+
+        coordinator.records("BqgWr8dr0XV7", Mock(return_value=RECORDS))
+        coordinator.records_created("BqgWr8dr0XV7", [created])
+        coordinator.records_deleted("BqgWr8dr0XV7", ["LsaWr8dr0KSa"])
+
+        # Check the shared listing.
+        assert coordinator.records("BqgWr8dr0XV7", Mock()) == [RECORDS[1], created]
+
+    def test_invalid_state(self, tmp_path: Path) -> None:
+        """Test an invalid shared listing is ignored.
+
+        Args:
+            tmp_path: Temporary directory.
+
+        """
+        (tmp_path / "BqgWr8dr0XV7.json").write_text("{}", encoding="utf-8")
+        fetch = Mock(return_value=RECORDS)
+
+        # Check response data.
+        assert ZoneCoordinator(tmp_path).records("BqgWr8dr0XV7", fetch) == RECORDS
+        assert fetch.call_count == 1
@@ -0,0 +1,304 @@
+"""Certbot DNS Exonet tests."""
+
+import io
+import json
+from dataclasses import asdict
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from certbot_dns_exonet.hook import main
+from certbot_dns_exonet.services.challenge_plan import (
+    ChallengePlan,
+    IncompletePlanError,
+    PlannedRecord,
+)
+
+PLANNED = PlannedRecord(
+    domain="exodev.nl",
+    validation_name="_acme-challenge.exodev.nl",
+    validation="KEna0LvLAKFIcTCadLBQ",
+    zone_id="BqgWr8dr0XV7",
+    zone_name="exodev.nl",
+    name="_acme-challenge",
+    content='"KEna0LvLAKFIcTCadLBQ"',
+    record_id="LsaWr8dr0KSa",
+)
+
+
+class TestHook:
+    """Test the stand-alone hook."""
+
+    @patch("certbot_dns_exonet.hook.sleep")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.add_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records")
+    def test_auth(
+        self,
+        mock_plan_txt_records: Mock,
+        mock_add_txt_records: Mock,
+        mock_sleep: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """Test the auth hook using the certbot environment variables.
+
+        Args:
+            mock_plan_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records.
+            mock_add_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.add_txt_records.
+            mock_sleep: Mock of
+                time.sleep.
+            monkeypatch: Pytest monkeypatch fixture.
+            capsys: Pytest capture fixture.
+
+        """
+        monkeypatch.setenv("EXONET_API_TOKEN", "kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        monkeypatch.setenv("CERTBOT_DOMAIN", "exodev.nl")
+        monkeypatch.setenv("CERTBOT_VALIDATION", "KEna0LvLAKFIcTCadLBQ")
+        mock_add_txt_records.return_value = ChallengePlan((PLANNED,))
+
+        # Make the call.
+        assert main(["auth", "--propagation-seconds", "30"]) == 0
+
+        # Check mock calls.
+        assert mock_plan_txt_records.call_count == 1
+        assert mock_add_txt_records.call_count == 1
+
+        # Check call args.
+        assert mock_plan_txt_records.call_args[0][0] == [
+            ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ")
+        ]
+        assert mock_sleep.call_args[0][0] == 30
+
+        # Check output.
+        assert json.loads(capsys.readouterr().out) == asdict(PLANNED)
+
+    @patch("certbot_dns_exonet.hook.sleep")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records")
+    def test_auth_incomplete(
+        self,
+        mock_perform_txt_records: Mock,
+        mock_sleep: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """Test the auth hook writes the records created before a failure.
+
+        Args:
+            mock_perform_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records.
+            mock_sleep: Mock of
+                time.sleep.
+            monkeypatch: Pytest monkeypatch fixture.
+            capsys: Pytest capture fixture.
+
+        """
+        monkeypatch.setenv("EXONET_API_TOKEN", "kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        mock_perform_txt_records.side_effect = IncompletePlanError(
+            "Unable to find DNS zone for test.nl. Zone test.nl not found.",
+            ChallengePlan((PLANNED,)),
+        )
+        monkeypatch.setattr(
+            "sys.stdin", io.StringIO("exodev.nl KEna0LvLAKFIcTCadLBQ\ntest.nl x\n")
+        )
+
+        # Make the call.
+        assert main(["auth", "--batch"]) == 1
+
+        # Check mock calls.
+        assert mock_sleep.call_count == 0
+
+        # Check output.
+        output = capsys.readouterr()
+        assert json.loads(output.out) == asdict(PLANNED)
+        assert output.err == (
+            "Error: Unable to find DNS zone for test.nl. Zone test.nl not found.\n"
+        )
+
+    @patch("certbot_dns_exonet.hook.sleep")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.estimate_txt_records")
+    def test_auth_dry_run(
+        self,
+        mock_estimate_txt_records: Mock,
+        mock_perform_txt_records: Mock,
+        mock_sleep: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """Test the auth hook writes the estimate and fails when running dry.
+
+        Args:
+            mock_estimate_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.estimate_txt_records.
+            mock_perform_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.perform_txt_records.
+            mock_sleep: Mock of
+                time.sleep.
+            monkeypatch: Pytest monkeypatch fixture.
+            capsys: Pytest capture fixture.
+
+        """
+        monkeypatch.setenv("EXONET_API_TOKEN", "kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        monkeypatch.setattr(
+            "sys.stdin", io.StringIO("exodev.nl KEna0LvLAKFIcTCadLBQ\n")
+        )
+        mock_estimate_txt_records.return_value.report.return_value = "Dry run: ..."
+
+        # Make the call.
+        assert main(["auth", "--batch", "--dry-run"]) == 1
+
+        # Check mock calls.
+        assert mock_estimate_txt_records.call_count == 1
+        assert mock_perform_txt_records.call_count == 0
+        assert mock_sleep.call_count == 0
+
+        # Check output, nothing is passed to the cleanup.
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert captured.err == (
+            "Dry run: ...\nError: Dry run, no DNS records were created.\n"
+        )
+
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records")
+    def test_cleanup_auth_output(
+        self,
+        mock_plan_txt_records: Mock,
+        mock_del_txt_records: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test the cleanup hook deletes the records of the auth hook output.
+
+        Args:
+            mock_plan_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+            monkeypatch: Pytest monkeypatch fixture.
+
+        """
+        monkeypatch.setenv("EXONET_API_TOKEN", "kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        monkeypatch.setenv("CERTBOT_DOMAIN", "exodev.nl")
+        monkeypatch.setenv("CERTBOT_VALIDATION", "KEna0LvLAKFIcTCadLBQ")
+        monkeypatch.setenv("CERTBOT_AUTH_OUTPUT", json.dumps(asdict(PLANNED)))
+
+        # Make the call.
+        assert main(["cleanup"]) == 0
+
+        # Check call args, no zone lookups are needed.
+        assert mock_plan_txt_records.call_count == 0
+        assert list(mock_del_txt_records.call_args_list[0][0][0]) == [PLANNED]
+
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.del_txt_records")
+    @patch("certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records")
+    def test_cleanup_batch(
+        self,
+        mock_plan_txt_records: Mock,
+        mock_del_txt_records: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test the cleanup hook with a batch of challenges on stdin.
+
+        Args:
+            mock_plan_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.plan_txt_records.
+            mock_del_txt_records: Mock of
+                certbot_dns_exonet.services.dns_service.DnsService.del_txt_records.
+            monkeypatch: Pytest monkeypatch fixture.
+            tmp_path: Temporary directory.
+
+        """
+        credentials = tmp_path / "exonet.ini"
+        credentials.write_text(
+            "dns_exonet_token = kaSD0ffAD1ldSA92A0KODkaksda02KDAK\n", encoding="utf-8"
+        )
+        monkeypatch.setattr(
+            "sys.stdin",
+            io.StringIO(
+                "exodev.nl KEna0LvLAKFIcTCadLBQ\n"
+                "\n"
+                "www.exodev.nl _acme-challenge.www.exodev.nl H5yq_laL2PSK\n"
+            ),
+        )
+
+        mock_plan_txt_records.return_value = ChallengePlan((PLANNED,))
+
+        # Make the call.
+        assert main(["cleanup", "--batch", "--credentials", str(credentials)]) == 0
+
+        # Check mock calls, there are no records of the auth hook to delete.
+        assert mock_del_txt_records.call_count == 1
+        assert list(mock_del_txt_records.call_args[0][0]) == [PLANNED]
+
+        # Check call args.
+        assert mock_plan_txt_records.call_args[0][0] == [
+            ("exodev.nl", "_acme-challenge.exodev.nl", "KEna0LvLAKFIcTCadLBQ"),
+            ("www.exodev.nl", "_acme-challenge.www.exodev.nl", "H5yq_laL2PSK"),
+        ]
+
+    @pytest.mark.parametrize(
+        ("argv", "stdin", "error"),
+        [
+            (["auth"], "", "Error: Provide --credentials or the EXONET_API_TOKEN"),
+            (
+                ["auth", "--credentials", "/nonexistent/exonet.ini"],
+                "",
+                "Error: Unable to read credentials file",
+            ),
+            (["auth", "--batch"], "exodev.nl\n", "Error: Invalid challenge"),
+            (["cleanup", "--batch"], "{\n", "Error: Invalid record"),
+            (["cleanup"], "", "Error: CERTBOT_DOMAIN and CERTBOT_VALIDATION"),
+        ],
+    )
+    def test_errors(
+        self,
+        argv: list[str],
+        stdin: str,
+        error: str,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """Test errors are reported without a traceback.
+
+        Args:
+            argv: The command line arguments.
+            stdin: The input of the hook.
+            error: The expected start of the error.
+            monkeypatch: Pytest monkeypatch fixture.
+            capsys: Pytest capture fixture.
+
+        """
+        if argv != ["auth"]:
+            monkeypatch.setenv("EXONET_API_TOKEN", "kaSD0ffAD1ldSA92A0KODkaksda02KDAK")
+        else:
+            monkeypatch.delenv("EXONET_API_TOKEN", raising=False)
+        monkeypatch.delenv("CERTBOT_DOMAIN", raising=False)
+        monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+
+        # Make the call.
+        assert main(argv) == 1
+
+        # Check output.
+        assert capsys.readouterr().err.startswith(error)
+
+    @pytest.mark.parametrize("chunk_size", ["0", "-1", "many"])
+    def test_invalid_chunk_size(
+        self, chunk_size: str, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test the chunk size must be a positive integer.
+
+        Args:
+            chunk_size: The chunk size argument.
+            capsys: Pytest capture fixture.
+
+        """
+        # Make the call.
+        with pytest.raises(SystemExit):
+            main(["cleanup", "--chunk-size", chunk_size])
+
+        # Check output.
+        assert "must be a positive integer" in capsys.readouterr().err